@@ -1,15 +1,380 @@
 import cv2
 import numpy as np
 import time
+from collections import Counter, deque
 from datetime import datetime
+from face_landmarks import FaceLandmarks
+from ring_buffer import RingBuffer
+
+def compute_eye_aspect_ratios(eye_points):
+    """(..., 6, 2) göz noktaları için EAR değerleri (...)"""
+    eye_points = np.asarray(eye_points, dtype=np.float64)
+    
+    # Dikey mesafeler
+    v1 = np.linalg.norm(eye_points[..., 1, :] - eye_points[..., 5, :], axis=-1)
+    v2 = np.linalg.norm(eye_points[..., 2, :] - eye_points[..., 4, :], axis=-1)
+    
+    # Yatay mesafe
+    h = np.linalg.norm(eye_points[..., 0, :] - eye_points[..., 3, :], axis=-1)
+    
+    return (v1 + v2) / np.maximum(2.0 * h, 1e-6)
+
+def mouth_aspect_ratios(mouth_points):
+    """(..., 20, 2) ağız noktaları (48-67) için ağız açıklık oranları (...)"""
+    mouth_points = np.asarray(mouth_points, dtype=np.float64)
+    
+    mouth_height = np.linalg.norm(mouth_points[..., 2, :] - mouth_points[..., 6, :], axis=-1)
+    mouth_width = np.linalg.norm(mouth_points[..., 0, :] - mouth_points[..., 4, :], axis=-1)
+    return mouth_height / np.maximum(mouth_width, 0.001)
+
+def compute_face_metrics(landmarks):
+    """(..., 68, 2) landmark dizisi için göz/ağız oranlarını tek vektörel çağrıda hesaplar
+    
+    Girdi tek yüz (68, 2), F yüz (F, 68, 2) veya F yüz x T kare (F, T, 68, 2) olabilir.
+    """
+    points = np.asarray(landmarks, dtype=np.float64)
+    
+    # Her iki göz birlikte: (..., 2, 6, 2)
+    eyes = points[..., 36:48, :].reshape(points.shape[:-2] + (2, 6, 2))
+    ears = compute_eye_aspect_ratios(eyes)
+    
+    mouth = points[..., 48:68, :]
+    inner_height = np.linalg.norm(mouth[..., 14, :] - mouth[..., 18, :], axis=-1)  # 62-66
+    inner_width = np.linalg.norm(mouth[..., 12, :] - mouth[..., 16, :], axis=-1)   # 60-64
+    
+    # Göz merkezleri arası mesafe ve yüz genişliği (ölçek referansı)
+    eye_centers = eyes.mean(axis=-2)
+    eye_distance = np.linalg.norm(eye_centers[..., 1, :] - eye_centers[..., 0, :], axis=-1)
+    face_width = np.linalg.norm(points[..., 16, :] - points[..., 0, :], axis=-1)
+    
+    return {
+        "left_ear": ears[..., 0],
+        "right_ear": ears[..., 1],
+        "ear": ears.mean(axis=-1),
+        "mar": mouth_aspect_ratios(mouth),
+        "inner_mar": inner_height / np.maximum(inner_width, 0.001),
+        "eye_distance": eye_distance,
+        "eye_distance_ratio": eye_distance / np.maximum(face_width, 1e-6)
+    }
+
+class BlurPyramid:
+    """Görüntü için Gauss piramidi - bulanıklık seviyeleri çekirdek yeniden hesaplanmadan seçilir"""
+    def __init__(self, max_level=2):
+        self.max_level = max_level
+        self.source = None
+        
+        # Küçültülmüş seviyeler ve kaynak boyutuna büyütülmüş halleri (tembel)
+        self._down = []
+        self._up = {}
+    
+    def build(self, image):
+        """Yeni kaynak görüntü ayarlar; seviyeler ilk istendiğinde hesaplanır"""
+        self.source = image
+        self._down = [image] if image is not None else []
+        self._up = {0: image} if image is not None else {}
+    
+    def level(self, index):
+        """Kaynak boyutunda, verilen piramit seviyesi kadar bulanık görüntü"""
+        index = max(0, min(int(index), self.max_level))
+        if index in self._up:
+            return self._up[index]
+        
+        # Eksik küçültülmüş seviyeleri hesapla (çok küçük görüntülerde dur)
+        while len(self._down) <= index:
+            previous = self._down[-1]
+            if min(previous.shape[:2]) < 4:
+                return self.level(len(self._down) - 1)
+            self._down.append(cv2.pyrDown(previous))
+        
+        # Kaynak boyutuna geri büyüt
+        upsampled = self._down[index]
+        for i in range(index - 1, -1, -1):
+            height, width = self._down[i].shape[:2]
+            upsampled = cv2.pyrUp(upsampled, dstsize=(width, height))
+        
+        self._up[index] = upsampled
+        return upsampled
+    
+    def blur(self, amount):
+        """Sürekli bulanıklık seviyesi (0 - max_level): komşu iki seviye doğrusal karıştırılır"""
+        amount = max(0.0, min(float(amount), float(self.max_level)))
+        low = int(amount)
+        weight = amount - low
+        if weight == 0:
+            return self.level(low)
+        return cv2.addWeighted(self.level(low), 1 - weight, self.level(low + 1), weight, 0)
+
+class MakeupMaskCache:
+    """Makyaj şablonlarını landmark geometrisine göre önbelleğe alır"""
+    def __init__(self, reuse_tolerance=1.0, redraw_tolerance=3.0):
+        # Bu kadar pikselden az hareket: şablon olduğu gibi kullanılır
+        self.reuse_tolerance = reuse_tolerance
+        # Benzerlik dönüşümünün artığı bundan büyükse şablon yeniden çizilir
+        self.redraw_tolerance = redraw_tolerance
+        
+        self.key = None
+        # Çizildiği andaki referans şablon ve landmark'lar
+        self.ref_points = None
+        self.ref_template = None
+        # Son kullanılan (dönüştürülmüş) şablon ve landmark'lar
+        self.current_points = None
+        self.current_template = None
+    
+    def store(self, points, key, template):
+        """Yeni çizilen şablonu referans olarak kaydeder"""
+        self.key = key
+        self.ref_points = points.astype(np.float32)
+        self.ref_template = template
+        self.current_points = self.ref_points
+        self.current_template = template
+    
+    def invalidate(self):
+        """Önbelleği temizler"""
+        self.key = None
+        self.ref_template = None
+        self.current_template = None
+    
+    def lookup(self, points, key):
+        """Kullanılabilir şablonu döndürür, yoksa None (yeniden çizilmeli)"""
+        if self.ref_template is None or key != self.key or len(points) != len(self.ref_points):
+            return None
+        
+        points = points.astype(np.float32)
+        
+        # Önceki kareye göre hareket toleransın altındaysa aynen kullan
+        if np.abs(points - self.current_points).max() <= self.reuse_tolerance:
+            return self.current_template
+        
+        # Referanstan mevcut landmark'lara benzerlik dönüşümü (döndürme + ölçek + öteleme)
+        matrix, _ = cv2.estimateAffinePartial2D(self.ref_points, points)
+        if matrix is None:
+            return None
+        
+        # Dönüşüm geometriyi açıklamıyorsa (ör. ağız açıldı) yeniden çiz
+        projected = self.ref_points @ matrix[:, :2].T + matrix[:, 2]
+        if np.abs(projected - points).max() > self.redraw_tolerance:
+            return None
+        
+        # Her zaman referanstan dönüştür: hata birikmez
+        template = {
+            "color": self._warp_region(self.ref_template["color"], matrix),
+            "foundation": None
+        }
+        if self.ref_template["foundation"] is not None:
+            face_bbox, foundation_mask, foundation_alpha = self.ref_template["foundation"]
+            warped_bbox, warped_mask = self._warp_region((face_bbox, foundation_mask), matrix)
+            template["foundation"] = (warped_bbox, warped_mask, foundation_alpha)
+        
+        self.current_points = points
+        self.current_template = template
+        return template
+    
+    @staticmethod
+    def _warp_region(region, matrix):
+        """Kutu-yerel dizileri dönüşümle taşır; (yeni kutu, dizi...) döndürür"""
+        bbox, arrays = region[0], region[1:]
+        x_min, y_min, x_max, y_max = bbox
+        
+        # Yeni kutu: dönüştürülmüş köşelerin sınırları
+        corners = np.array([[x_min, y_min], [x_max, y_min], [x_min, y_max], [x_max, y_max]], dtype=np.float32)
+        corners = corners @ matrix[:, :2].T + matrix[:, 2]
+        new_x_min, new_y_min = np.floor(corners.min(axis=0)).astype(int)
+        new_x_max, new_y_max = np.ceil(corners.max(axis=0)).astype(int)
+        
+        # Kutu-yerel koordinatlar arası dönüşüm
+        local = matrix.copy()
+        local[:, 2] += matrix[:, :2] @ np.array([x_min, y_min], dtype=matrix.dtype) - (new_x_min, new_y_min)
+        size = (int(new_x_max - new_x_min), int(new_y_max - new_y_min))
+        
+        warped = [cv2.warpAffine(array, local, size, flags=cv2.INTER_NEAREST) for array in arrays]
+        return ((int(new_x_min), int(new_y_min), int(new_x_max), int(new_y_max)),) + tuple(warped)
+
+class GestureHistory:
+    """Zaman damgalı hareket geçmişi - ekleme/süre dolumunda artımlı sayaçlar, O(1) mod sorgusu"""
+    def __init__(self, window_seconds=3.0):
+        self.window_seconds = window_seconds
+        self.events = deque()     # (hareket, zaman) eskiden yeniye
+        self.counts = Counter()   # hareket -> penceredeki adet
+        self._mode = ("none", 0)
+    
+    def __len__(self):
+        return len(self.events)
+    
+    def clear(self):
+        self.events.clear()
+        self.counts.clear()
+        self._mode = ("none", 0)
+    
+    def append(self, gesture, timestamp=None):
+        """Yeni hareket ekler; mod yalnızca bu hareketin sayısıyla karşılaştırılır"""
+        if timestamp is None:
+            timestamp = time.time()
+        self.events.append((gesture, timestamp))
+        self.counts[gesture] += 1
+        
+        if self.counts[gesture] > self._mode[1]:
+            self._mode = (gesture, self.counts[gesture])
+    
+    def expire(self, now=None):
+        """Pencere dışına düşen hareketleri soldan çıkarır"""
+        if now is None:
+            now = time.time()
+        
+        mode_changed = False
+        while self.events and now - self.events[0][1] >= self.window_seconds:
+            gesture, _ = self.events.popleft()
+            self.counts[gesture] -= 1
+            if self.counts[gesture] == 0:
+                del self.counts[gesture]
+            if gesture == self._mode[0]:
+                mode_changed = True
+        
+        # Mod yalnızca azaldıysa yeniden bulunur (farklı hareket türü sayısı küçük ve sabit)
+        if mode_changed:
+            if self.counts:
+                gesture = max(self.counts, key=self.counts.get)
+                self._mode = (gesture, self.counts[gesture])
+            else:
+                self._mode = ("none", 0)
+    
+    def mode(self):
+        """(en sık hareket, adet)"""
+        return self._mode
+    
+    def count(self, gesture):
+        return self.counts.get(gesture, 0)
+    
+    def sequence(self, seconds=None, now=None):
+        """Son `seconds` saniyedeki hareketler (eskiden yeniye) - baş sallama gibi uzun desenler için"""
+        if seconds is None:
+            return [g for g, _ in self.events]
+        if now is None:
+            now = time.time()
+        
+        recent = []
+        for gesture, timestamp in reversed(self.events):
+            if now - timestamp >= seconds:
+                break
+            recent.append(gesture)
+        recent.reverse()
+        return recent
+
+class HeadMotionTracker:
+    """Yüz bölgesindeki seyrek noktalar üzerinde Lucas-Kanade akışı ile baş hareketi tahmini"""
+    def __init__(self, max_points=30, win_size=(15, 15), max_level=2, margin=0.25, redetect_interval=30):
+        self.max_points = max_points
+        self.margin = margin
+        self.redetect_interval = redetect_interval
+        self.win_size = win_size
+        self.max_level = max_level
+        self.criteria = (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+        
+        # Takip bölgesi (x_min, y_min, x_max, y_max), önceki karenin piramidi ve noktalar
+        self.region = None
+        self._prev_pyramid = None
+        self.points = None
+        self.frames_since_detect = 0
+    
+    def reset(self):
+        self.region = None
+        self.points = None
+        self.frames_since_detect = 0
+    
+    def _expanded_region(self, gray, face_rect):
+        """Yüz dikdörtgenini kenar payıyla genişletip kareye kırpar"""
+        x, y, w, h = face_rect
+        pad_x, pad_y = int(w * self.margin), int(h * self.margin)
+        return (max(x - pad_x, 0), max(y - pad_y, 0),
+                min(x + w + pad_x, gray.shape[1]), min(y + h + pad_y, gray.shape[0]))
+    
+    def _build_pyramid(self, crop):
+        """Bölgenin Gauss piramidi - kare başına bir kez kurulur, sonraki karede önceki piramit olur"""
+        _, pyramid = cv2.buildOpticalFlowPyramid(crop, self.win_size, self.max_level, withDerivatives=False,
+                                                 tryReuseInputImage=False)
+        return pyramid
+    
+    def _track(self, prev_pyramid, pyramid, points):
+        """Önbellekteki piramit seviyelerinde kabadan inceye Lucas-Kanade
+        
+        Python arayüzü hazır piramit kabul etmediğinden her seviye maxLevel=0 ile izlenir;
+        kaba seviyenin sonucu bir alt seviyenin başlangıç tahminidir.
+        """
+        top = len(pyramid) - 1
+        guess = (points / (2 ** top)).astype(np.float32)
+        status = np.ones((len(points), 1), dtype=np.uint8)
+        for level in range(top, -1, -1):
+            level_points = (points / (2 ** level)).astype(np.float32)
+            guess, level_status, _ = cv2.calcOpticalFlowPyrLK(prev_pyramid[level], pyramid[level], level_points, guess,
+                                                              winSize=self.win_size, maxLevel=0,
+                                                              criteria=self.criteria,
+                                                              flags=cv2.OPTFLOW_USE_INITIAL_FLOW)
+            status &= level_status
+            if level > 0:
+                guess = guess * 2.0
+        return guess, status
+    
+    def _detect(self, gray, face_rect):
+        """Yüz dikdörtgeni içinde takip edilecek köşe noktalarını seçer"""
+        self.region = self._expanded_region(gray, face_rect)
+        x_min, y_min, x_max, y_max = self.region
+        crop = gray[y_min:y_max, x_min:x_max]
+        
+        # Noktalar yalnızca yüzün kendisinden seçilir (kenar payı arka plan olabilir)
+        x, y, w, h = face_rect
+        mask = np.zeros(crop.shape, dtype=np.uint8)
+        mask[max(y - y_min, 0):y + h - y_min, max(x - x_min, 0):x + w - x_min] = 255
+        
+        self.points = cv2.goodFeaturesToTrack(crop, self.max_points, 0.01, 7, mask=mask)
+        self._prev_pyramid = self._build_pyramid(crop)
+        self.frames_since_detect = 0
+    
+    def update(self, gray, face_rect):
+        """Önceki kareye göre medyan nokta kaymasını (dx, dy) döndürür; ölçülemezse None"""
+        if self.region is None or self.points is None or len(self.points) == 0:
+            self._detect(gray, face_rect)
+            return None
+        
+        # Yüz takip bölgesinin dışına çıktıysa (ör. yüz kaybolup geri geldiyse) yeniden başla
+        x_min, y_min, x_max, y_max = self.region
+        x, y, w, h = face_rect
+        if not (x_min <= x + w // 2 < x_max and y_min <= y + h // 2 < y_max):
+            self._detect(gray, face_rect)
+            return None
+        
+        crop = gray[y_min:y_max, x_min:x_max]
+        if crop.shape != self._prev_pyramid[0].shape:
+            self._detect(gray, face_rect)
+            return None
+        
+        pyramid = self._build_pyramid(crop)
+        new_points, status = self._track(self._prev_pyramid, pyramid, self.points)
+        
+        motion = None
+        good = status.reshape(-1) == 1
+        if np.any(good):
+            displacement = new_points[good] - self.points[good]
+            motion = np.median(displacement.reshape(-1, 2), axis=0)
+        
+        # Bu karenin piramidi sonraki karede önceki piramit olarak kullanılır
+        self._prev_pyramid = pyramid
+        self.points = new_points[good].reshape(-1, 1, 2)
+        self.frames_since_detect += 1
+        
+        # Noktalar azaldıysa veya süre dolduysa yeniden seç
+        if len(self.points) < self.max_points // 2 or self.frames_since_detect >= self.redetect_interval:
+            self._detect(gray, face_rect)
+        
+        return motion
 
 class AdvancedFeatures:
-    def __init__(self):
+    def __init__(self, event_bus=None):
+        # Tespit olaylarının yayınlandığı olay yolu (isteğe bağlı)
+        self.event_bus = event_bus
+        
         # Göz takibi için değişkenler
         self.blink_threshold = 0.2  # Göz kırpma eşiği
         self.blink_counter = 0
         self.blink_time = time.time()
-        self.eye_aspect_ratios = []
         self.eye_closed_time = 0
         self.last_blink_time = time.time()
         
@@ -21,6 +386,12 @@ class AdvancedFeatures:
         self.yawn_threshold = 0.6  # Esneme eşiği
         self.yawn_time = 0
         
+        # Zaman serisi tamponları (~30 fps'de 5 dakikalık pencere kapasitesi)
+        self.history_capacity = 30 * 60 * 5
+        self.eye_aspect_ratios = RingBuffer(self.history_capacity)
+        self.mouth_ratios = RingBuffer(self.history_capacity)
+        self.ear_window_seconds = 1.0  # Ortalama EAR penceresi (saniye)
+        
         # Yaşlandırma/gençleştirme için değişkenler
         self.age_effect_level = 0  # -10 (gençleştirme) ile 10 (yaşlandırma) arası
         
@@ -28,50 +399,48 @@ class AdvancedFeatures:
         self.makeup_type = "none"  # none, light, medium, heavy
         self.makeup_color = (0, 0, 0)  # BGR renk değeri
         
+        # Makyaj maskeleri için kareler arasında yeniden kullanılan tamponlar
+        self._mask_buffers = {}
+        self._dilate_kernel = np.ones((3, 3), np.uint8)
+        
+        # Landmark geometrisine göre önbelleğe alınan makyaj şablonları
+        self.makeup_cache = MakeupMaskCache()
+        
+        # Yaş efekti ve makyaj (foundation) için paylaşılan yüz bölgesi piramitleri
+        self.face_pyramid = BlurPyramid()
+        self.gray_pyramid = BlurPyramid()
+        
         # Yüz hareketleriyle kontrol için değişkenler
-        self.gesture_history = []
+        self.gesture_history = GestureHistory(window_seconds=3.0)
         self.last_gesture_time = time.time()
         
+        # Optik akış tabanlı baş hareketi takibi (eşik: yüz genişliğine oranla kare başı kayma)
+        self.head_tracker = HeadMotionTracker()
+        self.head_motion_threshold = 0.02
+        
         # Göz izleme tabanlı kontrol için değişkenler
-        self.gaze_points = []
+        self.gaze_points = RingBuffer(self.history_capacity, dim=2)
         self.gaze_direction = "center"  # left, right, up, down, center
         self.gaze_duration = 0
         
+    def _emit(self, event_type, **data):
+        """Olay yolu bağlıysa tespit olayını yayınlar"""
+        if self.event_bus is not None:
+            self.event_bus.publish(event_type, data)
+    
     def calculate_eye_aspect_ratio(self, eye_points):
         """Göz açıklık oranını hesaplar (EAR - Eye Aspect Ratio)"""
-        # Dikey mesafeler
-        # Tuple'ları numpy array'e dönüştür
-        p1 = np.array(eye_points[1])
-        p2 = np.array(eye_points[2])
-        p3 = np.array(eye_points[3])
-        p4 = np.array(eye_points[4])
-        p5 = np.array(eye_points[5])
-        p0 = np.array(eye_points[0])
-        
-        # Dikey mesafeler
-        v1 = np.linalg.norm(p1 - p5)
-        v2 = np.linalg.norm(p2 - p4)
-        
-        # Yatay mesafe
-        h = np.linalg.norm(p0 - p3)
-        
-        # EAR hesaplama
-        ear = (v1 + v2) / (2.0 * h)
-        return ear
-    
-    def detect_blinks(self, left_eye_points, right_eye_points):
+        return float(compute_eye_aspect_ratios(eye_points))
+    
+    def detect_blinks(self, left_eye_points, right_eye_points, ear=None):
         """Göz kırpma tespiti yapar"""
-        # Sol ve sağ göz için EAR hesapla
-        left_ear = self.calculate_eye_aspect_ratio(left_eye_points)
-        right_ear = self.calculate_eye_aspect_ratio(right_eye_points)
+        # Sol ve sağ göz için EAR tek çağrıda (önceden hesaplanmadıysa)
+        if ear is None:
+            ear = float(compute_eye_aspect_ratios(np.stack([np.asarray(left_eye_points),
+                                                            np.asarray(right_eye_points)])).mean())
         
-        # Ortalama EAR
-        ear = (left_ear + right_ear) / 2.0
-        
-        # EAR geçmişini güncelle
+        # EAR geçmişini güncelle (zaman damgalı halka tampon)
         self.eye_aspect_ratios.append(ear)
-        if len(self.eye_aspect_ratios) > 30:  # Son 30 kareyi tut
-            self.eye_aspect_ratios.pop(0)
         
         # Göz kırpma tespiti
         blinked = False
@@ -81,33 +450,32 @@ class AdvancedFeatures:
                 blinked = True
                 self.blink_counter += 1
                 self.last_blink_time = time.time()
+                
+                # Her kapanış için bir kez yayınla
+                if self.eye_closed_time == 3:
+                    self._emit("blink", ear=ear, blink_count=self.blink_counter)
         else:
             self.eye_closed_time = 0
         
         return blinked, ear, self.blink_counter
     
-    def detect_fatigue(self, ear, mouth_points):
+    def detect_fatigue(self, ear, mouth_points, mouth_ratio=None):
         """Yorgunluk tespiti yapar"""
         current_time = time.time()
         
-        # Göz yorgunluğu tespiti (uzun süre düşük EAR)
-        avg_ear = sum(self.eye_aspect_ratios) / max(len(self.eye_aspect_ratios), 1)
+        # Göz yorgunluğu tespiti (son ear_window_seconds saniyede düşük EAR)
+        avg_ear = float(self.eye_aspect_ratios.window_mean(self.ear_window_seconds, current_time)[0])
         
-        # Esneme tespiti (ağız açıklığı)
-        # Tuple'ları numpy array'e dönüştür
-        try:
-            mp2 = np.array(mouth_points[2])
-            mp6 = np.array(mouth_points[6])
-            mp0 = np.array(mouth_points[0])
-            mp4 = np.array(mouth_points[4])
-            
-            mouth_height = np.linalg.norm(mp2 - mp6)
-            mouth_width = np.linalg.norm(mp0 - mp4)
-            mouth_ratio = mouth_height / max(mouth_width, 0.001)
-        except (TypeError, IndexError) as e:
-            # Hata durumunda varsayılan değerler kullan
-            print(f"Ağız noktaları işlenirken hata: {e}")
-            mouth_ratio = 0
+        # Esneme tespiti (ağız açıklığı) - önceden hesaplanmadıysa
+        if mouth_ratio is None:
+            try:
+                mouth_ratio = float(mouth_aspect_ratios(mouth_points))
+            except (TypeError, IndexError, ValueError) as e:
+                # Hata durumunda varsayılan değerler kullan
+                print(f"Ağız noktaları işlenirken hata: {e}")
+                mouth_ratio = 0
+        
+        self.mouth_ratios.append(mouth_ratio, current_time)
         
         yawning = False
         if mouth_ratio > self.yawn_threshold:
@@ -117,10 +485,12 @@ class AdvancedFeatures:
                 if current_time - self.last_blink_time > 3.0:  # Son esneme üzerinden 3 saniye geçtiyse
                     self.yawn_counter += 1
                     self.last_blink_time = current_time  # Yawn time'ı güncelle
+                    self._emit("yawn", mouth_ratio=mouth_ratio, yawn_count=self.yawn_counter)
         else:
             self.yawn_time = 0
         
         # Yorgunluk seviyesi hesaplama
+        previous_band = self._fatigue_band(self.fatigue_level)
         blink_rate = self.blink_counter / max((current_time - self.blink_time) / 60, 0.1)  # Dakikadaki kırpma sayısı
         
         # Normal kırpma hızı: dakikada 15-20 kez
@@ -136,83 +506,152 @@ class AdvancedFeatures:
             if self.fatigue_level < 0.3:
                 self.fatigue_start_time = None
         
+        # Yorgunluk seviyesi bant değiştirdiğinde (düşük/orta/yüksek) yayınla
+        band = self._fatigue_band(self.fatigue_level)
+        if band != previous_band:
+            self._emit("fatigue", level=self.fatigue_level, band=band, blink_rate=blink_rate, avg_ear=avg_ear)
+        
         return self.fatigue_level, yawning, self.yawn_counter
     
-    def apply_age_effect(self, face_img, landmarks, effect_level):
+    @staticmethod
+    def _fatigue_band(level):
+        """Uygulamadaki renk eşikleriyle aynı yorgunluk bandı"""
+        if level > 0.7:
+            return "high"
+        if level > 0.3:
+            return "medium"
+        return "low"
+    
+    def get_window_statistics(self, seconds, now=None):
+        """Son `seconds` saniye için EAR, ağız oranı ve bakış istatistikleri"""
+        if now is None:
+            now = time.time()
+        
+        statistics = {}
+        for name, series in (("ear", self.eye_aspect_ratios), ("mouth_ratio", self.mouth_ratios),
+                             ("gaze", self.gaze_points)):
+            count, mean, variance = series.window_stats(seconds, now)
+            statistics[name] = {
+                "count": count,
+                "mean": mean.tolist() if series.dim > 1 else float(mean[0]),
+                "variance": variance.tolist() if series.dim > 1 else float(variance[0])
+            }
+        return statistics
+    
+    def prepare_face_pyramid(self, face_img, face_gray=None):
+        """Yüz bölgesi için kare başına paylaşılan bulanıklık piramitlerini hazırlar"""
+        self.face_pyramid.build(face_img)
+        self.gray_pyramid.build(face_gray if face_gray is not None and face_gray.shape == face_img.shape[:2]
+                                else None)
+        return self.face_pyramid
+    
+    def _feathered_face_mask(self, shape, landmarks):
+        """Yumuşak kenarlı yüz maskesi (0-1 float) - dörtte bir çözünürlükte çizilip büyütülür"""
+        height, width = shape[:2]
+        small_size = (max(1, width // 4), max(1, height // 4))
+        small_mask = np.zeros((small_size[1], small_size[0]), dtype=np.uint8)
+        hull = cv2.convexHull((np.asarray(landmarks) / 4).astype(np.int32))
+        cv2.fillConvexPoly(small_mask, hull, 255)
+        
+        mask = cv2.resize(small_mask, (width, height), interpolation=cv2.INTER_LINEAR)
+        return (mask.astype(np.float32) / 255.0)[:, :, np.newaxis]
+    
+    def apply_age_effect(self, face_img, landmarks, effect_level, face_gray=None, pyramid=None):
         """Yaşlandırma veya gençleştirme efekti uygular"""
         # Efekt seviyesini -10 (gençleştirme) ile 10 (yaşlandırma) arasında sınırla
         effect_level = max(-10, min(10, effect_level))
         self.age_effect_level = effect_level
         
-        # Temel görüntü işleme
-        result = face_img.copy()
+        if effect_level == 0:
+            return face_img.copy()
+        
+        # Landmark kabı verildiyse yüz-yerel görünümü kullan
+        if isinstance(landmarks, FaceLandmarks):
+            landmarks = landmarks.local
+        
+        # Piramit verilmediyse bu yüz için hazırla
+        if pyramid is None or pyramid.source is None or pyramid.source.shape != face_img.shape:
+            pyramid = self.prepare_face_pyramid(face_img, face_gray)
+        
+        # Efekt seviyesi piramit seviyesini seçer (0-5 bulanıklık -> 0-max_level)
+        blur_amount = int(abs(effect_level) / 2)
+        pyramid_level = blur_amount * pyramid.max_level / 5.0
         
         # Yaşlandırma efekti
         if effect_level > 0:
-            # Kontrast azaltma
+            # Bulanıklaştırma (cilt pürüzsüzlüğünü azaltma) ve kontrast azaltma
             alpha = 1.0 - (effect_level / 20.0)
-            result = cv2.convertScaleAbs(result, alpha=alpha, beta=10)
-            
-            # Bulanıklaştırma (cilt pürüzsüzlüğünü azaltma)
-            blur_amount = int(effect_level / 2)
-            if blur_amount > 0:
-                result = cv2.GaussianBlur(result, (2*blur_amount+1, 2*blur_amount+1), 0)
+            result = cv2.convertScaleAbs(pyramid.blur(pyramid_level), alpha=alpha, beta=10)
             
             # Gri tonları artırma (saç beyazlatma efekti)
-            gray = cv2.cvtColor(result, cv2.COLOR_BGR2GRAY)
+            if self.gray_pyramid.source is not None:
+                # Önbellekteki gri gösterime aynı işlemleri tek kanalda uygula
+                gray = cv2.convertScaleAbs(self.gray_pyramid.blur(pyramid_level), alpha=alpha, beta=10)
+            else:
+                gray = cv2.cvtColor(result, cv2.COLOR_BGR2GRAY)
             gray = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
             gray_intensity = effect_level / 20.0
             result = cv2.addWeighted(result, 1 - gray_intensity, gray, gray_intensity, 0)
         
         # Gençleştirme efekti
-        elif effect_level < 0:
+        else:
             # Pozitif değere çevir
             youth_level = -effect_level
             
             # Kontrast artırma
             alpha = 1.0 + (youth_level / 30.0)
-            result = cv2.convertScaleAbs(result, alpha=alpha, beta=-5)
+            result = cv2.convertScaleAbs(face_img, alpha=alpha, beta=-5)
             
-            # Bulanıklaştırma (cilt pürüzsüzleştirme)
-            blur_amount = int(youth_level / 2)
+            # Bulanıklaştırma (cilt pürüzsüzleştirme) - yumuşak kenarlı yüz maskesi ile
             if blur_amount > 0:
-                face_mask = np.zeros(result.shape[:2], dtype=np.uint8)
-                hull = cv2.convexHull(landmarks.astype(np.int32))
-                cv2.fillConvexPoly(face_mask, hull, 255)
-                
-                blurred = cv2.GaussianBlur(result, (2*blur_amount+1, 2*blur_amount+1), 0)
-                result = np.where(face_mask[:,:,np.newaxis] == 255, blurred, result)
+                blurred = cv2.convertScaleAbs(pyramid.blur(pyramid_level), alpha=alpha, beta=-5)
+                feather = self._feathered_face_mask(result.shape, landmarks)
+                result = (result + (blurred.astype(np.float32) - result) * feather).astype(np.uint8)
         
         return result
     
-    def apply_virtual_makeup(self, face_img, landmarks, makeup_type="light", makeup_color=(0, 0, 255)):
-        """Sanal makyaj uygular"""
-        self.makeup_type = makeup_type
-        self.makeup_color = makeup_color
-        
-        result = face_img.copy()
-        
-        # Yüz maskesi oluştur
-        face_mask = np.zeros(result.shape[:2], dtype=np.uint8)
-        hull = cv2.convexHull(landmarks.astype(np.int32))
-        cv2.fillConvexPoly(face_mask, hull, 255)
-        
+    def _get_mask_buffer(self, name, height, width):
+        """Kareler arasında yeniden kullanılan sıfırlanmış maske tamponu döndürür"""
+        buffer = self._mask_buffers.get(name)
+        if buffer is None or buffer.shape[0] < height or buffer.shape[1] < width:
+            # Tampon yalnızca büyütülür, küçük bölgeler görünüm olarak kullanılır
+            buffer_height, buffer_width = height, width
+            if buffer is not None:
+                buffer_height, buffer_width = max(height, buffer.shape[0]), max(width, buffer.shape[1])
+            buffer = np.zeros((buffer_height, buffer_width), dtype=np.uint8)
+            self._mask_buffers[name] = buffer
+        
+        view = buffer[:height, :width]
+        view.fill(0)
+        return view
+    
+    @staticmethod
+    def _points_bbox(points, padding=0):
+        """Noktaların sınırlayıcı kutusu (x_min, y_min, x_max, y_max) - görüntüye kırpılmaz"""
+        x_min, y_min = points.min(axis=0) - padding
+        x_max, y_max = points.max(axis=0) + padding + 1
+        return int(x_min), int(y_min), int(x_max), int(y_max)
+    
+    @staticmethod
+    def _clip_bbox(bbox, img_w, img_h):
+        """Kutuyu görüntüye kırpar; (görüntü dilimi, şablon dilimi) döndürür"""
+        x_min, y_min, x_max, y_max = bbox
+        cx_min, cy_min = max(0, x_min), max(0, y_min)
+        cx_max, cy_max = min(img_w, x_max), min(img_h, y_max)
+        if cx_max <= cx_min or cy_max <= cy_min:
+            return None, None
+        image_slice = (slice(cy_min, cy_max), slice(cx_min, cx_max))
+        template_slice = (slice(cy_min - y_min, cy_max - y_min), slice(cx_min - x_min, cx_max - x_min))
+        return image_slice, template_slice
+    
+    def _render_makeup_template(self, points, makeup_type, makeup_color):
+        """Makyaj maskelerini ve renk katmanını landmark'lardan çizer"""
         # Dudak bölgesi
-        mouth_points = landmarks[48:60]  # Dudak noktaları
-        mouth_mask = np.zeros(result.shape[:2], dtype=np.uint8)
-        cv2.fillConvexPoly(mouth_mask, mouth_points.astype(np.int32), 255)
+        mouth_points = points[48:60]  # Dudak noktaları
         
         # Göz bölgeleri
-        left_eye = landmarks[36:42]  # Sol göz noktaları
-        right_eye = landmarks[42:48]  # Sağ göz noktaları
-        
-        eyes_mask = np.zeros(result.shape[:2], dtype=np.uint8)
-        cv2.fillConvexPoly(eyes_mask, left_eye.astype(np.int32), 255)
-        cv2.fillConvexPoly(eyes_mask, right_eye.astype(np.int32), 255)
-        
-        # Makyaj tipine göre uygulama
-        if makeup_type == "none":
-            return result
+        left_eye = points[36:42]  # Sol göz noktaları
+        right_eye = points[42:48]  # Sağ göz noktaları
         
         # Ruj uygulama
         lip_color = makeup_color
@@ -224,67 +663,155 @@ class AdvancedFeatures:
         elif makeup_type == "heavy":
             lip_alpha = 0.7
         
-        lip_layer = np.zeros_like(result)
-        lip_layer[mouth_mask == 255] = lip_color
-        result = cv2.addWeighted(result, 1.0, lip_layer, lip_alpha, 0)
+        full_makeup = makeup_type in ["medium", "heavy"]
+        
+        # Yanak bölgelerini belirle (basit yaklaşım)
+        nose_tip = points[29]  # Burun ucu
+        cheek_centers = np.array([[nose_tip[0] - 30, nose_tip[1]],   # Sola kaydır
+                                  [nose_tip[0] + 30, nose_tip[1]]])  # Sağa kaydır
+        cheek_radius = int(np.linalg.norm(points[0] - points[16]) / 8)
+        
+        # Tüm renk bileşenlerini kapsayan kutu
+        if full_makeup:
+            # Göz çevresi 3x3 çekirdek, 2 iterasyon -> 2 piksel pay
+            extent = np.vstack([mouth_points, points[36:48] - 2, points[36:48] + 2,
+                                cheek_centers - (cheek_radius + 1), cheek_centers + (cheek_radius + 1)])
+        else:
+            extent = mouth_points
+        color_bbox = self._points_bbox(extent)
+        x_min, y_min, x_max, y_max = color_bbox
+        offset = (x_min, y_min)
+        roi_h, roi_w = y_max - y_min, x_max - x_min
+        
+        color_layer = np.zeros((roi_h, roi_w, 3), dtype=np.uint8)
+        color_mask = np.zeros((roi_h, roi_w), dtype=np.uint8)
+        
+        def add_component(mask, color, alpha):
+            cv2.add(color_layer, (color[0] * alpha, color[1] * alpha, color[2] * alpha, 0),
+                    dst=color_layer, mask=mask)
+            cv2.bitwise_or(color_mask, mask, dst=color_mask)
+        
+        mouth_mask = self._get_mask_buffer("mouth", roi_h, roi_w)
+        cv2.fillConvexPoly(mouth_mask, mouth_points - offset, 255)
+        add_component(mouth_mask, lip_color, lip_alpha)
+        
+        template = {"color": (color_bbox, color_layer, color_mask), "foundation": None}
+        if not full_makeup:
+            return template
         
         # Göz makyajı (eyeliner/far)
-        if makeup_type in ["medium", "heavy"]:
-            eye_color = (makeup_color[0], makeup_color[1], min(255, makeup_color[2] + 50))
-            eye_alpha = 0.4 if makeup_type == "medium" else 0.6
-            
-            # Göz çevresini genişlet
-            kernel = np.ones((3, 3), np.uint8)
-            eyes_mask_dilated = cv2.dilate(eyes_mask, kernel, iterations=2)
-            eyes_mask_outline = eyes_mask_dilated - eyes_mask
-            
-            eye_layer = np.zeros_like(result)
-            eye_layer[eyes_mask_outline == 255] = eye_color
-            result = cv2.addWeighted(result, 1.0, eye_layer, eye_alpha, 0)
+        eye_color = (makeup_color[0], makeup_color[1], min(255, makeup_color[2] + 50))
+        eye_alpha = 0.4 if makeup_type == "medium" else 0.6
+        
+        # Göz çevresini genişlet
+        eyes_mask = self._get_mask_buffer("eyes", roi_h, roi_w)
+        cv2.fillConvexPoly(eyes_mask, left_eye - offset, 255)
+        cv2.fillConvexPoly(eyes_mask, right_eye - offset, 255)
+        eyes_outline = self._get_mask_buffer("eyes_outline", roi_h, roi_w)
+        cv2.dilate(eyes_mask, self._dilate_kernel, dst=eyes_outline, iterations=2)
+        cv2.subtract(eyes_outline, eyes_mask, dst=eyes_outline)
+        add_component(eyes_outline, eye_color, eye_alpha)
         
         # Allık (yanak)
-        if makeup_type in ["medium", "heavy"]:
-            cheek_color = (makeup_color[0], min(255, makeup_color[1] + 50), makeup_color[2])
-            cheek_alpha = 0.2 if makeup_type == "medium" else 0.3
-            
-            # Yanak bölgelerini belirle (basit yaklaşım)
-            left_cheek_center = landmarks[29].astype(np.int32)  # Burun ucu
-            left_cheek_center[0] -= 30  # Sola kaydır
-            
-            right_cheek_center = landmarks[29].astype(np.int32)
-            right_cheek_center[0] += 30  # Sağa kaydır
-            
-            cheek_radius = int(np.linalg.norm(landmarks[0] - landmarks[16]) / 8)
-            
-            cheek_mask = np.zeros(result.shape[:2], dtype=np.uint8)
-            cv2.circle(cheek_mask, (left_cheek_center[0], left_cheek_center[1]), cheek_radius, 255, -1)
-            cv2.circle(cheek_mask, (right_cheek_center[0], right_cheek_center[1]), cheek_radius, 255, -1)
-            
-            # Göz ve ağız bölgelerini çıkar
-            cheek_mask = cheek_mask & ~eyes_mask & ~mouth_mask
-            
-            cheek_layer = np.zeros_like(result)
-            cheek_layer[cheek_mask == 255] = cheek_color
-            result = cv2.addWeighted(result, 1.0, cheek_layer, cheek_alpha, 0)
+        cheek_color = (makeup_color[0], min(255, makeup_color[1] + 50), makeup_color[2])
+        cheek_alpha = 0.2 if makeup_type == "medium" else 0.3
+        
+        cheek_mask = self._get_mask_buffer("cheek", roi_h, roi_w)
+        for center in cheek_centers - offset:
+            cv2.circle(cheek_mask, (int(center[0]), int(center[1])), cheek_radius, 255, -1)
+        
+        # Göz ve ağız bölgelerini çıkar
+        cv2.subtract(cheek_mask, eyes_mask, dst=cheek_mask)
+        cv2.subtract(cheek_mask, mouth_mask, dst=cheek_mask)
+        add_component(cheek_mask, cheek_color, cheek_alpha)
         
         # Cilt tonu düzeltme (foundation)
-        if makeup_type in ["medium", "heavy"]:
-            foundation_alpha = 0.15 if makeup_type == "medium" else 0.25
-            
-            # Yüz maskesini kullan, göz ve ağız bölgelerini çıkar
-            foundation_mask = face_mask & ~eyes_mask & ~mouth_mask
-            
-            # Cilt tonunu düzeltme (hafif bulanıklaştırma ve renk düzeltme)
-            foundation = cv2.GaussianBlur(result, (5, 5), 0)
-            
-            # Cilt tonunu hafifçe düzelt
-            foundation_layer = np.zeros_like(result)
-            foundation_layer[foundation_mask == 255] = foundation[foundation_mask == 255]
-            
-            result = cv2.addWeighted(result, 1.0, foundation_layer, foundation_alpha, 0)
+        foundation_alpha = 0.15 if makeup_type == "medium" else 0.25
+        
+        # Yüz maskesini kullan, göz ve ağız bölgelerini çıkar
+        face_bbox = self._points_bbox(points)
+        offset = face_bbox[:2]
+        foundation_mask = np.zeros((face_bbox[3] - face_bbox[1], face_bbox[2] - face_bbox[0]), dtype=np.uint8)
+        cv2.fillConvexPoly(foundation_mask, cv2.convexHull(points) - offset, 255)
+        cv2.fillConvexPoly(foundation_mask, left_eye - offset, 0)
+        cv2.fillConvexPoly(foundation_mask, right_eye - offset, 0)
+        cv2.fillConvexPoly(foundation_mask, mouth_points - offset, 0)
+        template["foundation"] = (face_bbox, foundation_mask, foundation_alpha)
+        
+        return template
+    
+    def _apply_makeup_template(self, result, template, pyramid=None):
+        """Önceden hazırlanmış makyaj şablonunu görüntüye uygular (foundation + tek renk karışımı)
+        
+        pyramid verilirse kaynağı result ile aynı görüntü olmalıdır; foundation renklerden önce
+        uygulandığından paylaşılan piramit bu noktada hâlâ geçerlidir.
+        """
+        img_h, img_w = result.shape[:2]
+        
+        if template["foundation"] is not None:
+            self._apply_foundation(result, template["foundation"], pyramid)
+        
+        # Ruj, göz ve allık tek karışımda
+        color_bbox, color_layer, color_mask = template["color"]
+        image_slice, template_slice = self._clip_bbox(color_bbox, img_w, img_h)
+        if image_slice is not None:
+            roi = result[image_slice]
+            cv2.add(roi, color_layer[template_slice], dst=roi, mask=color_mask[template_slice])
         
         return result
     
+    def _apply_foundation(self, result, foundation_template, pyramid=None):
+        """Cilt tonu düzeltme: maskeli bölgeye görüntünün hafif bulanık halini ekler"""
+        img_h, img_w = result.shape[:2]
+        face_bbox, foundation_mask, foundation_alpha = foundation_template
+        image_slice, template_slice = self._clip_bbox(face_bbox, img_w, img_h)
+        if image_slice is None:
+            return
+        
+        # Cilt tonunu düzeltme (hafif bulanıklaştırma)
+        if pyramid is not None and pyramid.source is not None and pyramid.source.shape == result.shape:
+            # Kare başına hazırlanan piramidin ilk seviyesi ~5x5 Gauss
+            foundation = pyramid.level(1)[image_slice]
+        else:
+            # 5x5 çekirdek için 2 piksel pay
+            y_min, y_max = image_slice[0].start, image_slice[0].stop
+            x_min, x_max = image_slice[1].start, image_slice[1].stop
+            pad_x_min, pad_y_min = max(0, x_min - 2), max(0, y_min - 2)
+            pad_x_max, pad_y_max = min(img_w, x_max + 2), min(img_h, y_max + 2)
+            foundation = cv2.GaussianBlur(result[pad_y_min:pad_y_max, pad_x_min:pad_x_max], (5, 5), 0)
+            foundation = foundation[y_min - pad_y_min:y_max - pad_y_min, x_min - pad_x_min:x_max - pad_x_min]
+        
+        # Cilt tonunu hafifçe düzelt
+        foundation = cv2.multiply(foundation, (foundation_alpha,) * 3 + (0,), dtype=cv2.CV_8U)
+        roi = result[image_slice]
+        cv2.add(roi, foundation, dst=roi, mask=foundation_mask[template_slice])
+    
+    def apply_virtual_makeup(self, face_img, landmarks, makeup_type="light", makeup_color=(0, 0, 255), pyramid=None):
+        """Sanal makyaj uygular"""
+        self.makeup_type = makeup_type
+        self.makeup_color = makeup_color
+        
+        result = face_img.copy()
+        
+        # Makyaj tipine göre uygulama
+        if makeup_type == "none":
+            return result
+        
+        # Landmark kabı verildiyse yüz-yerel görünümü kullan (kopyasız int32)
+        if isinstance(landmarks, FaceLandmarks):
+            points = landmarks.local
+        else:
+            points = np.asarray(landmarks).astype(np.int32)
+        cache_key = (makeup_type, tuple(makeup_color))
+        
+        # Landmark'lar az hareket ettiyse önbellekteki (gerekirse dönüştürülmüş) şablonu kullan
+        template = self.makeup_cache.lookup(points, cache_key)
+        if template is None:
+            template = self._render_makeup_template(points, makeup_type, makeup_color)
+            self.makeup_cache.store(points, cache_key, template)
+        
+        return self._apply_makeup_template(result, template, pyramid)
+    
     def detect_gaze(self, eye_points, face_points):
         """Göz bakış yönünü tespit eder"""
         # Göz merkezini hesapla
@@ -323,11 +850,10 @@ class AdvancedFeatures:
         else:
             self.gaze_duration = 0
             self.gaze_direction = direction
+            self._emit("gaze", direction=direction)
         
-        # Bakış noktalarını kaydet (son 10 nokta)
+        # Bakış noktalarını kaydet (zaman damgalı halka tampon)
         self.gaze_points.append(eye_center)
-        if len(self.gaze_points) > 10:
-            self.gaze_points.pop(0)
         
         return direction, self.gaze_duration, eye_center
     
@@ -353,29 +879,50 @@ class AdvancedFeatures:
         # Hareket yönünü belirle
         gesture = "none"
         if total_motion > motion_threshold:
-            if abs(horizontal_motion) > abs(vertical_motion) and abs(horizontal_motion) > direction_threshold:
-                gesture = "head_turn_left" if horizontal_motion < 0 else "head_turn_right"
-            elif abs(vertical_motion) > abs(horizontal_motion) and abs(vertical_motion) > direction_threshold:
-                gesture = "head_nod_up" if vertical_motion < 0 else "head_nod_down"
+            gesture = self._classify_motion(horizontal_motion, vertical_motion, direction_threshold)
         
-        # Hareket geçmişini güncelle
+        return self._update_gesture_history(gesture)
+    
+    def detect_head_gesture(self, gray, face_rect):
+        """Yüz bölgesindeki seyrek optik akış ile baş hareketlerini tespit eder"""
+        if face_rect is None:
+            self.head_tracker.reset()
+            return self._update_gesture_history("none")
+        
+        gesture = "none"
+        try:
+            motion = self.head_tracker.update(gray, face_rect)
+            if motion is not None:
+                threshold = self.head_motion_threshold * face_rect[2]
+                gesture = self._classify_motion(motion[0], motion[1], threshold)
+        except cv2.error as e:
+            print(f"Optik akış hatası: {e}")
+            self.head_tracker.reset()
+        
+        return self._update_gesture_history(gesture)
+    
+    @staticmethod
+    def _classify_motion(horizontal_motion, vertical_motion, direction_threshold):
+        """Baskın hareket yönünü hareket adına çevirir"""
+        if abs(horizontal_motion) > abs(vertical_motion) and abs(horizontal_motion) > direction_threshold:
+            return "head_turn_left" if horizontal_motion < 0 else "head_turn_right"
+        if abs(vertical_motion) > abs(horizontal_motion) and abs(vertical_motion) > direction_threshold:
+            return "head_nod_up" if vertical_motion < 0 else "head_nod_down"
+        return "none"
+    
+    def _update_gesture_history(self, gesture):
+        """Hareket geçmişini günceller ve (en sık hareket, adet) döndürür"""
         current_time = time.time()
         if gesture != "none":
-            self.gesture_history.append((gesture, current_time))
+            self.gesture_history.append(gesture, current_time)
+            self.last_gesture_time = current_time
+            self._emit("gesture", gesture=gesture)
         
         # Son 3 saniyedeki hareketleri tut
-        self.gesture_history = [(g, t) for g, t in self.gesture_history if current_time - t < 3.0]
-        
-        # En sık tekrarlanan hareketi bul
-        if self.gesture_history:
-            gestures = [g for g, _ in self.gesture_history]
-            most_common_gesture = max(set(gestures), key=gestures.count)
-            gesture_count = gestures.count(most_common_gesture)
-        else:
-            most_common_gesture = "none"
-            gesture_count = 0
+        self.gesture_history.expire(current_time)
         
-        return most_common_gesture, gesture_count
+        # En sık tekrarlanan hareket (artımlı sayaçlardan)
+        return self.gesture_history.mode()
     
     def reset_counters(self):
         """Sayaçları sıfırlar"""
@@ -384,8 +931,10 @@ class AdvancedFeatures:
         self.yawn_counter = 0
         self.fatigue_level = 0.0
         self.fatigue_start_time = None
-        self.eye_aspect_ratios = []
-        self.gesture_history = []
-        self.gaze_points = []
+        self.eye_aspect_ratios.clear()
+        self.mouth_ratios.clear()
+        self.gesture_history.clear()
+        self.head_tracker.reset()
+        self.gaze_points.clear()
         self.gaze_direction = "center"
         self.gaze_duration = 0
\ No newline at end of file
@@ -3,6 +3,29 @@ import numpy as np
 import os
 from math import sin, cos, radians
 
+class FaceAnchors:
+    """68 noktalı landmark dizisinden tüm AR bağlantı noktalarını tek seferde hesaplar"""
+    def __init__(self, landmarks):
+        points = np.asarray(landmarks, dtype=np.float32).reshape(-1, 2)
+        
+        # Yüz sınırları (vektörel indirgeme)
+        self.min_xy = points.min(axis=0)
+        self.max_xy = points.max(axis=0)
+        self.face_width, self.face_height = self.max_xy - self.min_xy
+        self.center = points.mean(axis=0)
+        
+        # Göz merkezleri ve köşeleri
+        self.left_eye_center = points[36:42].mean(axis=0)
+        self.right_eye_center = points[42:48].mean(axis=0)
+        self.left_eye_corner = points[36]
+        self.right_eye_corner = points[45]
+        
+        # Burun, ağız ve çene
+        self.nose_top = points[27]
+        self.mouth_corner = points[48]
+        self.mouth_center = (points[48] + points[54]) / 2
+        self.chin = points[8]
+
 class ARFilters:
     def __init__(self):
         # AR filtreleri için gerekli kaynakları yükle
@@ -23,6 +46,19 @@ class ARFilters:
         
         # Aktif filtre
         self.active_filter = None
+        
+        # Filtre adı -> yerleşim fonksiyonu (FaceAnchors üzerinden)
+        self._placements = {
+            'Gözlük': self._place_glasses,
+            'Şapka': self._place_hat,
+            'Maske': self._place_mask,
+            'Sakal': self._place_beard,
+            'Hayvan Kulakları': self._place_ears,
+            'Işık Efekti': self._place_light
+        }
+        
+        # Ölçeklenmiş filtre önbelleği: ad -> ((genişlik, yükseklik), görüntü)
+        self._resized_cache = {}
     
     def _load_filter_resources(self):
         """Filtre kaynaklarını yükler"""
@@ -101,7 +137,7 @@ class ARFilters:
             return True
         return False
     
-    def apply_filter(self, frame, landmarks):
+    def apply_filter(self, frame, landmarks, anchors=None):
         """Seçili filtreyi kareye uygular"""
         if self.active_filter is None or landmarks is None:
             return frame
@@ -115,99 +151,86 @@ class ARFilters:
         if len(landmarks) < 68:  # En az 68 landmark noktası gerekli
             return frame
         
-        # Yüz genişliği ve yüksekliği hesapla
-        face_width = max(landmark[0] for landmark in landmarks) - min(landmark[0] for landmark in landmarks)
-        face_height = max(landmark[1] for landmark in landmarks) - min(landmark[1] for landmark in landmarks)
-        
-        # Filtreyi yüz boyutuna göre ölçekle
-        if self.active_filter == 'Gözlük':
-            # Gözlük için göz konumlarını kullan
-            left_eye = landmarks[36]  # Sol göz köşesi
-            right_eye = landmarks[45]  # Sağ göz köşesi
-            eye_width = right_eye[0] - left_eye[0]
-            
-            # Gözlük boyutunu ayarla
-            filter_width = int(eye_width * 1.5)
-            filter_height = int(filter_width * filter_img.shape[0] / filter_img.shape[1])
-            filter_resized = cv2.resize(filter_img, (filter_width, filter_height))
-            
-            # Gözlük konumunu ayarla
-            x_offset = int(left_eye[0] - filter_width * 0.25)
-            y_offset = int(left_eye[1] - filter_height * 0.5)
-            
-        elif self.active_filter == 'Şapka':
-            # Şapka için alın konumunu kullan
-            forehead = landmarks[27]  # Burun üstü
-            
-            # Şapka boyutunu ayarla
-            filter_width = int(face_width * 1.2)
-            filter_height = int(filter_width * filter_img.shape[0] / filter_img.shape[1])
-            filter_resized = cv2.resize(filter_img, (filter_width, filter_height))
-            
-            # Şapka konumunu ayarla
-            x_offset = int(forehead[0] - filter_width / 2)
-            y_offset = int(forehead[1] - filter_height)
-            
-        elif self.active_filter == 'Maske':
-            # Maske için ağız konumunu kullan
-            mouth = landmarks[48]  # Ağız köşesi
-            
-            # Maske boyutunu ayarla
-            filter_width = int(face_width * 0.8)
-            filter_height = int(face_height * 0.4)
-            filter_resized = cv2.resize(filter_img, (filter_width, filter_height))
-            
-            # Maske konumunu ayarla
-            x_offset = int(mouth[0] - filter_width / 2)
-            y_offset = int(mouth[1] - filter_height / 2)
-            
-        elif self.active_filter == 'Sakal':
-            # Sakal için çene konumunu kullan
-            chin = landmarks[8]  # Çene ucu
-            
-            # Sakal boyutunu ayarla
-            filter_width = int(face_width * 0.8)
-            filter_height = int(face_height * 0.4)
-            filter_resized = cv2.resize(filter_img, (filter_width, filter_height))
-            
-            # Sakal konumunu ayarla
-            x_offset = int(chin[0] - filter_width / 2)
-            y_offset = int(chin[1] - filter_height / 2)
-            
-        elif self.active_filter == 'Hayvan Kulakları':
-            # Kulaklar için baş üstünü kullan
-            top_head = landmarks[27]  # Burun üstü
-            
-            # Kulak boyutunu ayarla
-            filter_width = int(face_width * 1.5)
-            filter_height = int(filter_width * filter_img.shape[0] / filter_img.shape[1])
-            filter_resized = cv2.resize(filter_img, (filter_width, filter_height))
-            
-            # Kulak konumunu ayarla
-            x_offset = int(top_head[0] - filter_width / 2)
-            y_offset = int(top_head[1] - filter_height)
-            
-        elif self.active_filter == 'Işık Efekti':
-            # Işık efekti için yüz merkezini kullan
-            face_center_x = int(sum(landmark[0] for landmark in landmarks) / len(landmarks))
-            face_center_y = int(sum(landmark[1] for landmark in landmarks) / len(landmarks))
-            
-            # Işık efekti boyutunu ayarla
-            filter_width = int(face_width * 2)
-            filter_height = filter_width
-            filter_resized = cv2.resize(filter_img, (filter_width, filter_height))
-            
-            # Işık efekti konumunu ayarla
-            x_offset = int(face_center_x - filter_width / 2)
-            y_offset = int(face_center_y - filter_height / 2)
-        else:
+        # Bağlantı noktaları kare başına bir kez hesaplanır
+        if anchors is None:
+            anchors = FaceAnchors(landmarks)
+        
+        placement = self._placements.get(self.active_filter)
+        if placement is None:
+            return frame
+        
+        # Filtrenin konumunu ve boyutunu belirle
+        x_offset, y_offset, filter_width, filter_height = placement(anchors, filter_img.shape)
+        if filter_width <= 0 or filter_height <= 0:
             return frame
         
         # Filtreyi kareye uygula
+        filter_resized = self._get_resized_filter(self.active_filter, filter_width, filter_height)
         self._overlay_image(frame, filter_resized, x_offset, y_offset)
         
         return frame
     
+    def _get_resized_filter(self, filter_name, width, height):
+        """Ölçeklenmiş filtreyi önbellekten döndürür, boyut değiştiyse yeniden ölçekler"""
+        cached = self._resized_cache.get(filter_name)
+        if cached is not None and cached[0] == (width, height):
+            return cached[1]
+        
+        filter_resized = cv2.resize(self.filters[filter_name], (width, height))
+        self._resized_cache[filter_name] = ((width, height), filter_resized)
+        return filter_resized
+    
+    @staticmethod
+    def _place_glasses(anchors, filter_shape):
+        """Gözlük: göz köşelerine göre"""
+        left_eye = anchors.left_eye_corner
+        eye_width = anchors.right_eye_corner[0] - left_eye[0]
+        filter_width = int(eye_width * 1.5)
+        filter_height = int(filter_width * filter_shape[0] / filter_shape[1])
+        return (int(left_eye[0] - filter_width * 0.25), int(left_eye[1] - filter_height * 0.5),
+                filter_width, filter_height)
+    
+    @staticmethod
+    def _place_hat(anchors, filter_shape):
+        """Şapka: burun üstünün üzerine"""
+        filter_width = int(anchors.face_width * 1.2)
+        filter_height = int(filter_width * filter_shape[0] / filter_shape[1])
+        return (int(anchors.nose_top[0] - filter_width / 2), int(anchors.nose_top[1] - filter_height),
+                filter_width, filter_height)
+    
+    @staticmethod
+    def _place_mask(anchors, filter_shape):
+        """Maske: ağız köşesinin etrafına"""
+        filter_width = int(anchors.face_width * 0.8)
+        filter_height = int(anchors.face_height * 0.4)
+        return (int(anchors.mouth_corner[0] - filter_width / 2), int(anchors.mouth_corner[1] - filter_height / 2),
+                filter_width, filter_height)
+    
+    @staticmethod
+    def _place_beard(anchors, filter_shape):
+        """Sakal: çene ucunun etrafına"""
+        filter_width = int(anchors.face_width * 0.8)
+        filter_height = int(anchors.face_height * 0.4)
+        return (int(anchors.chin[0] - filter_width / 2), int(anchors.chin[1] - filter_height / 2),
+                filter_width, filter_height)
+    
+    @staticmethod
+    def _place_ears(anchors, filter_shape):
+        """Hayvan kulakları: başın üstüne"""
+        filter_width = int(anchors.face_width * 1.5)
+        filter_height = int(filter_width * filter_shape[0] / filter_shape[1])
+        return (int(anchors.nose_top[0] - filter_width / 2), int(anchors.nose_top[1] - filter_height),
+                filter_width, filter_height)
+    
+    @staticmethod
+    def _place_light(anchors, filter_shape):
+        """Işık efekti: yüz merkezinin etrafına"""
+        filter_width = int(anchors.face_width * 2)
+        filter_height = filter_width
+        center_x, center_y = int(anchors.center[0]), int(anchors.center[1])
+        return (int(center_x - filter_width / 2), int(center_y - filter_height / 2),
+                filter_width, filter_height)
+    
     def _overlay_image(self, background, foreground, x_offset, y_offset):
         """Ön plan görüntüsünü arka plan üzerine bindirme"""
         # Ön plan görüntüsünün boyutlarını al
@@ -233,12 +256,13 @@ class ARFilters:
             h = bg_h - y_offset
         
         # Ön plan görüntüsünün alfa kanalını al
+        if h <= 0 or w <= 0:
+            return background
+        
         if foreground.shape[2] == 4:
-            alpha = foreground[:, :, 3] / 255.0
-            for c in range(3):
-                background[y_offset:y_offset+h, x_offset:x_offset+w, c] = \
-                    background[y_offset:y_offset+h, x_offset:x_offset+w, c] * (1 - alpha) + \
-                    foreground[:, :, c] * alpha
+            alpha = foreground[:, :, 3:4] / 255.0
+            region = background[y_offset:y_offset+h, x_offset:x_offset+w]
+            region[:] = region * (1 - alpha) + foreground[:, :, :3] * alpha
         else:
             background[y_offset:y_offset+h, x_offset:x_offset+w] = foreground
         
@@ -0,0 +1,170 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from face_landmarks import detect_landmarks
+from face_alignment import align_landmarks, FEATURE_VERSION
+from face_enrollment import EnrollmentSession, identity_of, template_id
+from face_store import FaceStore
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# İşçi süreç başına bir kez yüklenen dedektörler
+_face_cascade = None
+_eye_cascade = None
+
+def _init_worker():
+    """Her işçi süreçte Haar dedektörlerini yükler"""
+    global _face_cascade, _eye_cascade
+    _face_cascade = cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml'))
+    _eye_cascade = cv2.CascadeClassifier(os.path.join(cv2.data.haarcascades, 'haarcascade_eye.xml'))
+
+def extract_image_features(path):
+    """Görüntüdeki ilk yüzün özellik vektörü: (yol, özellik veya None, hata mesajı)"""
+    try:
+        # Türkçe karakterli yollar için imread yerine imdecode
+        image = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return path, None, "okunamadı"
+
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        face_rect, points = detect_landmarks(gray, _face_cascade, _eye_cascade)
+        if face_rect is None:
+            return path, None, "yüz bulunamadı"
+
+        return path, align_landmarks(points).features(), None
+    except Exception as e:
+        return path, None, str(e)
+
+def collect_images(root):
+    """Kök dizindeki her alt klasör bir kimlik: ({kimlik: [görüntü yolları]}, [atlanan klasörler])
+
+    "#" şablon ayırıcısı olduğundan adında "#" geçen klasörler kaydedilmez.
+    """
+    identities = {}
+    skipped = []
+    for name in sorted(os.listdir(root)):
+        folder = os.path.join(root, name)
+        if not os.path.isdir(folder):
+            continue
+        if "#" in name:
+            skipped.append(name)
+            continue
+
+        paths = []
+        for directory, _, files in os.walk(folder):
+            paths.extend(os.path.join(directory, file) for file in sorted(files)
+                         if file.lower().endswith(IMAGE_EXTENSIONS))
+        if paths:
+            identities[name] = paths
+    return identities, skipped
+
+def enroll_directory(root, store_dir, workers=None, mode="mean", replace=False, verbose=True):
+    """Klasör ağacını paralel özellik çıkarımıyla kaydeder ve depoyu tek yazımda günceller
+
+    Döndürülen özet: {"identities", "templates", "images", "failed", "skipped_folders", "seconds"}
+    """
+    start = time.perf_counter()
+    identities, skipped_folders = collect_images(root)
+    paths = [path for image_paths in identities.values() for path in image_paths]
+    if verbose:
+        for name in skipped_folders:
+            print(f"Uyarı: {name} klasörü atlandı (adında \"#\" olamaz)")
+        print(f"{len(identities)} kişi, {len(paths)} görüntü bulundu")
+
+    # Özellik çıkarımı süreç havuzunda
+    features_by_path = {}
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for path, features, error in executor.map(extract_image_features, paths, chunksize=8):
+            if features is None:
+                failed.append((path, error))
+            else:
+                features_by_path[path] = features
+
+    # Kişi başına şablon (aykırı örnekler elenir)
+    new_ids = []
+    new_templates = []
+    for identity, image_paths in identities.items():
+        samples = [features_by_path[path] for path in image_paths if path in features_by_path]
+        session = EnrollmentSession(identity, target_samples=len(samples), min_samples=1,
+                                    sample_interval=1, mode=mode)
+        for features in samples:
+            session.add_frame(features)
+
+        templates = session.build_templates()
+        if templates is None:
+            if verbose:
+                print(f"{identity}: kullanılabilir yüz yok, atlandı")
+            continue
+        for i, template in enumerate(templates):
+            new_ids.append(template_id(identity, i))
+            new_templates.append(template)
+
+    # Mevcut kayıtlarla birleştir: yeniden kaydedilen kişilerin eski şablonları çıkarılır
+    store = FaceStore(store_dir, feature_version=FEATURE_VERSION)
+    ids, matrix, metadata = [], None, {}
+
+    # Eski özellik sürümündeki vektörler yeni özelliklerle karşılaştırılamaz: uygulamadaki gibi arşivle
+    stored_version = store.stored_version() if store.exists() else None
+    if stored_version is not None and stored_version != FEATURE_VERSION:
+        archived = store.archive()
+        if verbose:
+            print(f"Yüz veritabanı eski özellik sürümünde ({stored_version}), {archived} dizinine arşivlendi")
+    elif not replace and store.exists():
+        ids, matrix, metadata = store.load()
+
+    enrolled = {identity_of(face_id) for face_id in new_ids}
+    keep = [row for row, face_id in enumerate(ids) if identity_of(face_id) not in enrolled]
+    kept_ids = [ids[row] for row in keep]
+
+    parts = []
+    if keep:
+        parts.append(np.asarray(matrix[keep], dtype=np.float32))
+    if new_templates:
+        parts.append(np.stack(new_templates).astype(np.float32))
+
+    enrolled_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    for face_id in new_ids:
+        metadata[face_id] = {"enrolled_at": enrolled_at, "source": "batch"}
+
+    all_ids = kept_ids + new_ids
+    if all_ids:
+        store.compact(all_ids, np.concatenate(parts), metadata)
+    else:
+        store.clear()
+
+    summary = {
+        "identities": len(enrolled),
+        "templates": len(new_ids),
+        "images": len(paths),
+        "failed": len(failed),
+        "skipped_folders": skipped_folders,
+        "seconds": time.perf_counter() - start
+    }
+    if verbose:
+        for path, error in failed:
+            print(f"Atlandı: {path} ({error})")
+        if skipped_folders:
+            print(f"Adında \"#\" olduğu için atlanan klasörler: {', '.join(skipped_folders)}")
+        print(f"{summary['identities']} kişi, {summary['templates']} şablon kaydedildi "
+              f"({summary['failed']} görüntü atlandı, {summary['seconds']:.1f} sn)")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Klasör ağacından toplu yüz kaydı (her alt klasör bir kişi)")
+    parser.add_argument("root", help="Kişi klasörlerini içeren dizin")
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "face_db"),
+                        help="Yüz veritabanı dizini")
+    parser.add_argument("--workers", type=int, default=None, help="İşçi süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--mode", choices=["mean", "exemplars"], default="mean",
+                        help="Kişi başına tek ortalama şablon veya birkaç örnek şablon")
+    parser.add_argument("--replace", action="store_true", help="Mevcut veritabanını tamamen değiştir")
+    args = parser.parse_args()
+
+    enroll_directory(args.root, args.db, workers=args.workers, mode=args.mode, replace=args.replace)
+
+if __name__ == "__main__":
+    main()
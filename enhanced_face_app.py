@@ -5,23 +5,38 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, colorchooser
 from PIL import Image, ImageTk
 from math import hypot
-import time
-import pickle
 import json
 from datetime import datetime
 import uuid
 import threading
-# Import the improved lip reading module
-try:
-    from improved_lip_reading import ImprovedLipReading as LipReading
-except ImportError:
-    from lip_reading import LipReading  # Fallback to basic lip reading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+# Import streaming lip reading (improved reader with basic fallback)
+from lip_reading_stream import LipReadingStream, create_lip_backend
 # Import voice commands module
 from voice_commands import VoiceCommands
 # Import AR filters module
-from ar_filters import ARFilters
+from ar_filters import ARFilters, FaceAnchors
 # Import advanced features module
-from advanced_features import AdvancedFeatures
+from advanced_features import AdvancedFeatures, compute_face_metrics
+# Import image filter engine
+from image_filters import ImageFilters
+# Import per-frame conversion cache
+from frame_context import FrameContext
+# Import landmark container and detector
+from face_landmarks import detect_landmarks
+# Import detection event bus
+from event_bus import EventBus, JSONLSink
+# Import face recognition index
+from face_index import IVFIndex
+# Import memory-mapped face database storage
+from face_store import FaceStore
+# Import per-track recognition cache
+from recognition_cache import RecognitionCache
+# Import multi-sample enrollment
+from face_enrollment import EnrollmentSession, identity_of, template_id
+# Import pose/scale normalization
+from face_alignment import align_landmarks, FEATURE_VERSION
 
 class FaceDetectionApp:
     def __init__(self, root):
@@ -40,8 +55,19 @@ class FaceDetectionApp:
         # AR filtreleri modülünü başlat
         self.ar_filters = ARFilters()
         
+        # Tespit olayları (göz kırpma, esneme, bakış, hareket) için olay yolu
+        self.event_bus = EventBus()
+        self.event_bus.start()
+        self.event_log_sink = None
+        
         # Gelişmiş özellikleri başlat
-        self.advanced_features = AdvancedFeatures()
+        self.advanced_features = AdvancedFeatures(event_bus=self.event_bus)
+        
+        # Görüntü filtre motorunu başlat
+        self.image_filters = ImageFilters()
+        
+        # Kare başına renk dönüşümü önbelleği (gray, hsv, rgb)
+        self.frame_ctx = FrameContext()
         
         # Ana çerçeve
         self.main_frame = ttk.Frame(root)
@@ -75,7 +101,7 @@ class FaceDetectionApp:
         ttk.Label(self.control_frame, text="Filtre:").grid(row=0, column=2, padx=5, pady=5)
         self.filter_var = tk.StringVar(value="Normal")
         self.filter_combo = ttk.Combobox(self.control_frame, textvariable=self.filter_var, 
-                                        values=["Normal", "Siyah-Beyaz", "Sepya", "Negatif", "Bulanık", "Kenar Algılama"])
+                                        values=self.image_filters.get_available_filters())
         self.filter_combo.grid(row=0, column=3, padx=5, pady=5)
         self.filter_combo.bind("<<ComboboxSelected>>", self.update_filter)
         
@@ -154,6 +180,18 @@ class FaceDetectionApp:
                                                     variable=self.fatigue_detection_var)
         self.fatigue_detection_check.grid(row=0, column=1, padx=5, pady=5)
         
+        # Optik akış ile baş hareketleri (baş sallama / çevirme)
+        self.head_gesture_var = tk.BooleanVar(value=False)
+        self.head_gesture_check = ttk.Checkbutton(self.advanced_frame, text="Baş Hareketleri", 
+                                                variable=self.head_gesture_var)
+        self.head_gesture_check.grid(row=0, column=2, padx=5, pady=5)
+        
+        # Tespit olaylarını JSONL dosyasına kaydetme
+        self.event_log_var = tk.BooleanVar(value=False)
+        self.event_log_check = ttk.Checkbutton(self.advanced_frame, text="Olayları Kaydet", 
+                                             variable=self.event_log_var, command=self.toggle_event_log)
+        self.event_log_check.grid(row=0, column=3, padx=5, pady=5)
+        
         # Yaşlandırma/Gençleştirme
         ttk.Label(self.advanced_frame, text="Yaş Efekti:").grid(row=1, column=0, padx=5, pady=5)
         self.age_effect_var = tk.IntVar(value=0)
@@ -228,6 +266,11 @@ class FaceDetectionApp:
         self.current_frame = None
         self.current_filter = "Normal"
         self.face_cascade = None
+        
+        # Filtreleme, yüz tespitiyle eşzamanlı çalışacak iş parçacığında yapılır
+        self.filter_executor = ThreadPoolExecutor(max_workers=1)
+        self.last_face_rect = None
+        self.last_points = None
         self.eye_cascade = None
         self.initialize_face_detector()
         
@@ -238,8 +281,28 @@ class FaceDetectionApp:
         self.age_ranges = ["18-25", "26-35", "36-45", "46-60", "60+"]
         self.genders = ["Erkek", "Kadın"]
         
-        # Yüz tanıma için veritabanı
-        self.face_database = {}
+        # Yüz tanıma için veritabanı (bitişik özellik matrisi + kimlikler)
+        # Büyük kadrolarda IVF yaklaşık arama; küçük veritabanında tam arama yapılır
+        self.face_index = IVFIndex()
+        self.recognition_threshold = 0.25  # Hizalanmış şablon birimlerinde mesafe eşiği
+        
+        # Kalıcı depo: bellek eşlemeli matris + ekleme günlüğü
+        self.face_store = FaceStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), "face_db"),
+                                    feature_version=FEATURE_VERSION)
+        
+        # Aynı yüz izi için tanıma sonucu önbelleği
+        self.recognition_cache = RecognitionCache()
+        
+        # Devam eden çok örnekli kayıt oturumu
+        self.enrollment_session = None
+        self.enrollment_mode = "mean"  # mean: tek ortalama şablon, exemplars: birkaç örnek şablon
+        
+        # Arka planda yüklenen depo/indeks ana iş parçacığına kuyrukla aktarılır ve birleştirilir
+        self.face_database_queue = queue.Queue()
+        self.pending_face_store_ops = []  # Yükleme sürerken bekletilen depo yazımları
+        self.face_database_version = 0  # Temizlemede artar; eski yükleme sonuçları atılır
+        self.face_database_loading = False
+        self.face_database_save_pending = False  # Yükleme sürerken istenen sıkıştırma
         self.load_face_database()
         
         # Yüz ölçümleri için referans değerler
@@ -260,8 +323,11 @@ class FaceDetectionApp:
             (255, 0, 255)   # Mor - dudaklar
         ]
         
-        # Dudak okuma sınıfını başlat
-        self.lip_reader = LipReading()
+        # Dudak okuma akışı: arka plan iş parçacığında çalışır, kelimeler kuyrukla ana iş parçacığına aktarılır
+        self.lip_reading_queue = queue.Queue()
+        self.lip_reading_stream = LipReadingStream(create_lip_backend(), on_result=self._post_lip_reading_result)
+        self.lip_reading_stream.start()
+        self.last_lip_result = None
         self.last_predicted_word = ""
         self.lip_reading_history = []
         
@@ -312,17 +378,116 @@ class FaceDetectionApp:
             return False
     
     def load_face_database(self):
-        """Yüz veritabanını yükle"""
-        db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face_database.pkl")
-        if os.path.exists(db_path):
+        """Yüz veritabanını arka planda yükle (arayüz iş parçacığını bloklamaz)"""
+        # Eski pickle veritabanı varsa bir kez yeni biçime taşı
+        legacy_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face_database.pkl")
+        try:
+            migrated = self.face_store.migrate_pickle(legacy_path)
+            if migrated:
+                print(f"{migrated} yüz face_database.pkl dosyasından taşındı")
+        except Exception as e:
+            print(f"Eski yüz veritabanı taşınırken hata: {e}")
+        
+        self.face_database_loading = True
+        loader = threading.Thread(target=self._load_face_database_worker,
+                                  args=(self.face_store.directory, self.face_store.compact_threshold,
+                                        self.face_database_version))
+        loader.daemon = True
+        loader.start()
+        
+        # Kamera kapalıyken de sonucu almak için ana iş parçacığında yoklanır
+        self.root.after(100, self._poll_face_database)
+    
+    def _load_face_database_worker(self, directory, compact_threshold, version):
+        """Ayrı bir depo örneğinden yükler; uygulama durumuna dokunmadan sonucu kuyruğa koyar"""
+        try:
+            face_store = FaceStore(directory, compact_threshold=compact_threshold,
+                                   feature_version=FEATURE_VERSION)
+            
+            # Eski özellik sürümündeki vektörler yeni özelliklerle karşılaştırılamaz: arşivle
+            notice = None
             try:
-                with open(db_path, 'rb') as f:
-                    self.face_database = pickle.load(f)
-                self.status_var.set(f"{len(self.face_database)} yüz veritabanından yüklendi")
-                self.update_recognition_list()
+                stored_version = face_store.stored_version()
+                if stored_version is not None and stored_version != FEATURE_VERSION:
+                    archived = face_store.archive()
+                    print(f"Yüz veritabanı eski özellik sürümünde, {archived} dizinine arşivlendi")
+                    notice = "Yüz veritabanı güncellendi: kişilerin yeniden kaydedilmesi gerekiyor"
             except Exception as e:
-                print(f"Yüz veritabanı yüklenirken hata: {e}")
-                self.status_var.set("Yüz veritabanı yüklenemedi!")
+                print(f"Yüz veritabanı sürümü denetlenirken hata: {e}")
+            
+            face_ids, features, _ = face_store.load()
+            face_index = IVFIndex()
+            if features is not None:
+                face_index.load_matrix(face_ids, features)
+            self.face_database_queue.put((version, face_store, face_index, None, notice))
+        except Exception as e:
+            self.face_database_queue.put((version, None, None, e, None))
+    
+    def _poll_face_database(self):
+        """Yükleme sonucunu ana iş parçacığında alır (update_frame'den de çağrılır)"""
+        try:
+            version, face_store, face_index, error, notice = self.face_database_queue.get_nowait()
+        except queue.Empty:
+            version = None
+        
+        # Yükleme sürerken veritabanı temizlendiyse eski sonuç atılır
+        if version is None or version != self.face_database_version:
+            if self.face_database_loading:
+                self.root.after(100, self._poll_face_database)
+            return
+        
+        self.face_database_loading = False
+        if error is not None:
+            print(f"Yüz veritabanı yüklenirken hata: {error}")
+            self.status_var.set("Yüz veritabanı yüklenemedi!")
+            self._apply_pending_face_store_ops(self.face_store)
+            return
+        
+        self._merge_face_database(face_store, face_index)
+        if self.face_database_save_pending:
+            self.face_database_save_pending = False
+            self.save_face_database()
+        self.recognition_cache.invalidate()
+        if notice is not None:
+            self.status_var.set(notice)
+        else:
+            self.status_var.set(f"{len(self.face_index)} yüz veritabanından yüklendi")
+        self.update_recognition_list()
+    
+    def _merge_face_database(self, face_store, face_index):
+        """Yüklenen indeksi ve depoyu, yükleme sürerken yapılan kayıtları kaybetmeden devralır"""
+        # Yükleme sırasında kaydedilen kişilerin yeni şablonları yüklenen eskilerinin yerine geçer
+        enrolled = {identity_of(face_id) for face_id in self.face_index}
+        replaced = [face_id for face_id in face_index
+                    if identity_of(face_id) in enrolled and face_id not in self.face_index]
+        for face_id in replaced:
+            face_index.remove(face_id)
+            face_store.remove(face_id)
+        for face_id, features in self.face_index.items():
+            face_index.add(face_id, features)
+        self.face_index = face_index
+        
+        # Bekletilen yazımlar zaten yüklenmiş depo örneğine uygulanır
+        self._apply_pending_face_store_ops(face_store)
+        self.face_store = face_store
+    
+    def _write_face_store(self, op, *args):
+        """Depo değişikliği; yükleme sürerken birleştirmeye kadar bekletilir
+        
+        Böylece ana iş parçacığındaki depo, append içinde eşzamanlı tam yükleme yapmaz.
+        """
+        if self.face_database_loading:
+            self.pending_face_store_ops.append((op, args))
+        else:
+            getattr(self.face_store, op)(*args)
+    
+    def _apply_pending_face_store_ops(self, face_store):
+        pending, self.pending_face_store_ops = self.pending_face_store_ops, []
+        try:
+            for op, args in pending:
+                getattr(face_store, op)(*args)
+        except Exception as e:
+            print(f"Bekleyen yüz kayıtları yazılırken hata: {e}")
     
     def toggle_camera(self):
         """Toggle camera on/off and update UI accordingly"""
@@ -364,16 +529,19 @@ class FaceDetectionApp:
             self.status_var.set("Kamera görüntüsü alınamadı!")
             return
         
+        # Arka planda yüklenen yüz veritabanı hazırsa devral
+        if self.face_database_loading:
+            self._poll_face_database()
+        
+        # Dudak okuma iş parçacığının tamamladığı kelimeleri göster
+        self._drain_lip_reading_queue()
+        
         # Görüntüyü işle
         self.current_frame = frame.copy()
         processed_frame = self.process_frame(frame)
         
-        # Dudak okuma işlemi
-        if self.show_lip_reading_var.get():
-            self.process_lip_reading(frame)
-        
-        # Görüntüyü Tkinter'da göstermek için dönüştür
-        camera_img = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
+        # Görüntüyü Tkinter'da göstermek için dönüştür (yeniden kullanılan tampona)
+        camera_img = self.frame_ctx.to_rgb(processed_frame)
         camera_img = Image.fromarray(camera_img)
         camera_img = ImageTk.PhotoImage(image=camera_img)
         
@@ -384,6 +552,19 @@ class FaceDetectionApp:
         # Tekrar çağır
         self.root.after(10, self.update_frame)
     
+    def toggle_event_log(self):
+        """Tespit olaylarının events.jsonl dosyasına yazılmasını açar/kapatır"""
+        if self.event_log_var.get():
+            if self.event_log_sink is None:
+                self.event_log_sink = self.event_bus.add_sink(JSONLSink("events.jsonl"))
+            self.status_var.set("Olaylar events.jsonl dosyasına kaydediliyor")
+        else:
+            if self.event_log_sink is not None:
+                self.event_bus.flush()
+                self.event_bus.remove_sink(self.event_log_sink)
+                self.event_log_sink = None
+            self.status_var.set("Olay kaydı durduruldu")
+    
     def choose_makeup_color(self):
         # Renk seçici iletişim kutusu
         color = colorchooser.askcolor(title="Makyaj Rengi Seç", initialcolor="#FF0000")
@@ -393,11 +574,30 @@ class FaceDetectionApp:
             self.makeup_color = (b, g, r)
     
     def process_frame(self, frame):
-        # Filtre uygula
-        filtered_frame = self.apply_filter(frame)
+        # Gri tonlama ham kareden bir kez hesaplanır ve tüm aşamalarla paylaşılır
+        self.frame_ctx.reset(frame)
+        gray = self.frame_ctx.get("gray")
         
-        # Yüz tespiti yap
-        face_rect, points = self.detect_face(filtered_frame)
+        # Filtre, tespitten bağımsız olarak ayrı bir iş parçacığında uygulanır
+        filter_future = self.filter_executor.submit(self.apply_filter, frame)
+        
+        # Yüz tespiti filtrelenmemiş ham kare üzerinde yapılır
+        face_rect, points = self.detect_face(frame, gray)
+        self.last_face_rect, self.last_points = face_rect, points
+        
+        # Çok örnekli kayıt sürüyorsa bu karenin örneğini ekle
+        if self.enrollment_session is not None:
+            self.collect_enrollment_sample(points)
+        
+        # Dudak okuma ham kareyle (çizimlerden önce) arka planda yapılır
+        if self.show_lip_reading_var.get():
+            self.process_lip_reading(face_rect, points)
+        
+        # Çizimler filtrelenmiş kare üzerine yapılır
+        filtered_frame = filter_future.result()
+        
+        if self.show_lip_reading_var.get() and face_rect is not None and self.last_lip_result is not None:
+            self.draw_lip_reading(filtered_frame, self.last_lip_result)
         
         if face_rect is not None:
             # Yüz dikdörtgenini çiz
@@ -415,9 +615,14 @@ class FaceDetectionApp:
                     right_eye_points = points[42:48]
                     mouth_points = points[48:68]
                     
+                    # Göz ve ağız oranları kare başına tek vektörel çağrıda
+                    face_metrics = compute_face_metrics(points)
+                    ear = float(face_metrics["ear"])
+                    
                     if self.eye_tracking_var.get():
                         # Göz kırpma tespiti
-                        blinked, ear, blink_count = self.advanced_features.detect_blinks(left_eye_points, right_eye_points)
+                        blinked, ear, blink_count = self.advanced_features.detect_blinks(left_eye_points, right_eye_points,
+                                                                                         ear)
                         if blinked:
                             cv2.putText(filtered_frame, "Göz Kırpma Algılandı!", (10, 30), 
                                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
@@ -429,7 +634,8 @@ class FaceDetectionApp:
                     
                     if self.fatigue_detection_var.get():
                         # Yorgunluk tespiti
-                        fatigue_level, yawning, yawn_count = self.advanced_features.detect_fatigue(ear, mouth_points)
+                        fatigue_level, yawning, yawn_count = self.advanced_features.detect_fatigue(
+                            ear, mouth_points, float(face_metrics["mar"]))
                         
                         # Yorgunluk seviyesini göster
                         fatigue_color = (0, 255, 0)  # Yeşil (düşük yorgunluk)
@@ -445,39 +651,53 @@ class FaceDetectionApp:
                             cv2.putText(filtered_frame, "Esneme Algılandı!", (10, 120), 
                                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
                 
-                # Yaşlandırma/Gençleştirme efekti
+                # Baş hareketleri (önceki karenin gri yüz bölgesine göre seyrek optik akış)
+                if self.head_gesture_var.get():
+                    gesture, gesture_count = self.advanced_features.detect_head_gesture(gray, face_rect)
+                    if gesture != "none":
+                        cv2.putText(filtered_frame, f"Hareket: {gesture} ({gesture_count})", (10, 150), 
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+                
+                # Yaş efekti ve makyaj için yüz bölgesi piramidi kare başına bir kez hazırlanır
                 age_effect_level = self.age_effect_var.get()
+                makeup_type = self.makeup_type_var.get()
+                face_pyramid = None
+                face_gray = None
+                if age_effect_level != 0 or makeup_type != "none":
+                    x, y, w, h = face_rect
+                    face_crop = filtered_frame[y:y+h, x:x+w].copy()
+                    # Gri piramidi yalnızca yaş efekti kullanır
+                    if age_effect_level != 0 and self.current_filter == "Normal":
+                        # Filtre yok: ham karenin önbellekteki gri gösterimi kırpmayla aynı
+                        face_gray = self.frame_ctx.get("gray", (x, y, x + w, y + h))
+                    elif age_effect_level != 0:
+                        # Filtrelenmiş yüze filtresiz pikseller karışmasın diye gri kırpmadan
+                        face_gray = cv2.cvtColor(face_crop, cv2.COLOR_BGR2GRAY)
+                    face_pyramid = self.advanced_features.prepare_face_pyramid(face_crop, face_gray)
+                
+                # Yaşlandırma/Gençleştirme efekti
                 if age_effect_level != 0:
-                    # Yüz bölgesini kırp
+                    # Yüz bölgesini kırp (landmark'ların yüz-yerel görünümü efekt içinde kullanılır)
                     x, y, w, h = face_rect
                     face_img = filtered_frame[y:y+h, x:x+w].copy()
                     
-                    # Yüz noktalarını yüz bölgesine göre ayarla
-                    face_points = points.copy()
-                    face_points[:, 0] -= x
-                    face_points[:, 1] -= y
-                    
-                    # Yaş efektini uygula
-                    aged_face = self.advanced_features.apply_age_effect(face_img, face_points, age_effect_level)
+                    # Yaş efektini uygula (paylaşılan piramit üzerinden)
+                    aged_face = self.advanced_features.apply_age_effect(face_img, points, age_effect_level,
+                                                                        face_gray, face_pyramid)
                     
                     # Efekti uygula
                     filtered_frame[y:y+h, x:x+w] = aged_face
                 
                 # Sanal makyaj
-                makeup_type = self.makeup_type_var.get()
                 if makeup_type != "none":
-                    # Yüz bölgesini kırp
+                    # Yüz bölgesini kırp (landmark'ların yüz-yerel görünümü efekt içinde kullanılır)
                     x, y, w, h = face_rect
                     face_img = filtered_frame[y:y+h, x:x+w].copy()
                     
-                    # Yüz noktalarını yüz bölgesine göre ayarla
-                    face_points = points.copy()
-                    face_points[:, 0] -= x
-                    face_points[:, 1] -= y
-                    
-                    # Makyaj uygula
-                    makeup_face = self.advanced_features.apply_virtual_makeup(face_img, face_points, 
-                                                                           makeup_type, self.makeup_color)
+                    # Makyaj uygula (yaş efekti yüzü değiştirdiyse piramit artık bu görüntüye ait değil)
+                    makeup_face = self.advanced_features.apply_virtual_makeup(face_img, points, 
+                                                                           makeup_type, self.makeup_color,
+                                                                           face_pyramid if age_effect_level == 0 else None)
                     
                     # Efekti uygula
                     filtered_frame[y:y+h, x:x+w] = makeup_face
@@ -577,7 +797,9 @@ class FaceDetectionApp:
             
             # Yüz tanıma göster
             if self.show_face_recognition_var.get():
-                face_id = self.recognize_face(points)
+                self.recognition_cache.next_frame()
+                face_id, _, _ = self.recognition_cache.lookup(face_rect, points, self.query_face,
+                                                              self.recognition_threshold)
                 if face_id:
                     cv2.putText(filtered_frame, f"Tanındı: {face_id}", (x, y - 50), 
                                 cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
@@ -588,19 +810,8 @@ class FaceDetectionApp:
         return filtered_frame
     
     def apply_filter(self, frame):
-        if self.current_filter == "Siyah-Beyaz":
-            return cv2.cvtColor(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
-        elif self.current_filter == "Sepya":
-            kernel = np.array([[0.272, 0.534, 0.131],
-                              [0.349, 0.686, 0.168],
-                              [0.393, 0.769, 0.189]])
-            return cv2.transform(frame, kernel)
-        elif self.current_filter == "Negatif":
-            return cv2.bitwise_not(frame)
-        elif self.current_filter == "Bulanık":
-            return cv2.GaussianBlur(frame, (15, 15), 0)
-        else:  # Normal
-            return frame
+        """Seçili görüntü filtresini filtre motoru üzerinden uygula"""
+        return self.image_filters.apply(frame, self.current_filter, self.frame_ctx)
     
     def update_filter(self, event=None):
         """Filtre değişikliğini günceller"""
@@ -608,115 +819,14 @@ class FaceDetectionApp:
         self.status_var.set(f"Filtre: {self.current_filter}")
         print(f"Filtre değiştirildi: {self.current_filter}")
     
-    def detect_face(self, frame):
-        # Yüz tespiti için gri tonlamaya dönüştür
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    def detect_face(self, frame, gray=None):
+        """Yüz tespiti yapar; (dikdörtgen, FaceLandmarks) döndürür"""
+        # Yüz tespiti için gri tonlamaya dönüştür (önceden hesaplanmadıysa)
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
         try:
-            # Yüzleri tespit et
-            faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
-            
-            if len(faces) == 0:
-                return None, None
-            
-            # İlk tespit edilen yüzü al
-            (x, y, w, h) = faces[0]
-            
-            # Yüz bölgesini kırp
-            roi_gray = gray[y:y+h, x:x+w]
-            roi_color = frame[y:y+h, x:x+w]
-            
-            # Gözleri tespit et (daha doğru landmark tespiti için)
-            eyes = self.eye_cascade.detectMultiScale(roi_gray)
-            
-            # Gelişmiş landmark noktaları oluştur
-            points = []
-            
-            # Çene noktaları (0-16)
-            for i in range(17):
-                jaw_x = x + int(i * w / 16)
-                jaw_y = y + h - int(h / 8)
-                points.append((jaw_x, jaw_y))
-            
-            # Kaş noktaları (17-26)
-            for i in range(5):
-                # Sol kaş
-                left_eyebrow_x = x + int(w / 4) + int(i * w / 10)
-                left_eyebrow_y = y + int(h / 4)
-                points.append((left_eyebrow_x, left_eyebrow_y))
-            
-            for i in range(5):
-                # Sağ kaş
-                right_eyebrow_x = x + int(w / 2) + int(i * w / 10)
-                right_eyebrow_y = y + int(h / 4)
-                points.append((right_eyebrow_x, right_eyebrow_y))
-            
-            # Burun noktaları (27-35)
-            nose_center_x = x + int(w / 2)
-            for i in range(9):
-                nose_x = nose_center_x
-                nose_y = y + int(h / 3) + int(i * h / 15)
-                points.append((nose_x, nose_y))
-            
-            # Göz noktaları (36-47)
-            # Eğer gözler tespit edildiyse, gerçek göz konumlarını kullan
-            if len(eyes) >= 2:
-                # Gözleri sol ve sağ olarak sırala
-                eyes = sorted(eyes, key=lambda e: e[0])
-                
-                # Sol göz
-                ex, ey, ew, eh = eyes[0]
-                left_eye_center_x = x + ex + ew // 2
-                left_eye_center_y = y + ey + eh // 2
-                
-                # Sağ göz
-                ex, ey, ew, eh = eyes[1]
-                right_eye_center_x = x + ex + ew // 2
-                right_eye_center_y = y + ey + eh // 2
-            else:
-                # Gözler tespit edilmediyse, tahmin et
-                left_eye_center_x = x + int(w / 3)
-                left_eye_center_y = y + int(h / 3)
-                right_eye_center_x = x + int(2 * w / 3)
-                right_eye_center_y = y + int(h / 3)
-            
-            # Sol göz noktaları
-            for i in range(6):
-                angle = i * 60
-                radius = w / 12
-                eye_x = left_eye_center_x + int(radius * np.cos(np.radians(angle)))
-                eye_y = left_eye_center_y + int(radius * np.sin(np.radians(angle)))
-                points.append((eye_x, eye_y))
-            
-            # Sağ göz noktaları
-            for i in range(6):
-                angle = i * 60
-                radius = w / 12
-                eye_x = right_eye_center_x + int(radius * np.cos(np.radians(angle)))
-                eye_y = right_eye_center_y + int(radius * np.sin(np.radians(angle)))
-                points.append((eye_x, eye_y))
-            
-            # Ağız noktaları (48-67)
-            mouth_center_x = x + int(w / 2)
-            mouth_center_y = y + int(3 * h / 4)
-            
-            # Dış dudak
-            for i in range(12):
-                angle = i * 30
-                radius = w / 6
-                lip_x = mouth_center_x + int(radius * np.cos(np.radians(angle)))
-                lip_y = mouth_center_y + int(radius * np.sin(np.radians(angle)))
-                points.append((lip_x, lip_y))
-            
-            # İç dudak
-            for i in range(8):
-                angle = i * 45
-                radius = w / 10
-                lip_x = mouth_center_x + int(radius * np.cos(np.radians(angle)))
-                lip_y = mouth_center_y + int(radius * np.sin(np.radians(angle)))
-                points.append((lip_x, lip_y))
-            
-            return (x, y, w, h), points
+            return detect_landmarks(gray, self.face_cascade, self.eye_cascade)
         
         except Exception as e:
             print(f"Yüz tespitinde hata: {e}")
@@ -762,16 +872,19 @@ class FaceDetectionApp:
             self.status_var.set("Kamera görüntüsü alınamadı!")
             return
         
+        # Arka planda yüklenen yüz veritabanı hazırsa devral
+        if self.face_database_loading:
+            self._poll_face_database()
+        
+        # Dudak okuma iş parçacığının tamamladığı kelimeleri göster
+        self._drain_lip_reading_queue()
+        
         # Görüntüyü işle
         self.current_frame = frame.copy()
         processed_frame = self.process_frame(frame)
         
-        # Dudak okuma işlemi
-        if self.show_lip_reading_var.get():
-            self.process_lip_reading(frame)
-        
-        # Görüntüyü Tkinter'da göstermek için dönüştür
-        camera_img = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
+        # Görüntüyü Tkinter'da göstermek için dönüştür (yeniden kullanılan tampona)
+        camera_img = self.frame_ctx.to_rgb(processed_frame)
         camera_img = Image.fromarray(camera_img)
         camera_img = ImageTk.PhotoImage(image=camera_img)
         
@@ -844,12 +957,12 @@ class FaceDetectionApp:
         
         # Her nokta için derinlik hesapla (basitleştirilmiş model)
         depth_points = []
-        for point in points:
+        for i, point in enumerate(points):
             # Burun ve yüz merkezi noktaları daha fazla derinliğe sahip
-            if point in points[27:36]:
+            if 27 <= i < 36:
                 depth = 30
             # Gözler ve kaşlar orta derinliğe sahip
-            elif point in points[17:27] or point in points[36:48]:
+            elif 17 <= i < 27 or 36 <= i < 48:
                 depth = 15
             # Çene ve dudaklar daha az derinliğe sahip
             else:
@@ -920,36 +1033,32 @@ class FaceDetectionApp:
         cv2.line(frame, points[67], points[60], self.face_mesh_colors[4], 2)
     
     def calculate_face_measurements(self, points):
-        """Yüz ölçümlerini hesapla"""
+        """Yüz ölçümlerini hesapla (hizalanmış noktalardan, piksel cinsinden)"""
         if points is None or len(points) < 68:
             return
         
+        alignment = self.get_face_alignment(points)
+        aligned = alignment.aligned
+        
+        def distance(a, b):
+            return alignment.to_pixels(float(np.linalg.norm(a - b)))
+        
         # Göz arası mesafe
-        left_eye_center = (sum([points[36][0], points[37][0], points[38][0], points[39][0], points[40][0], points[41][0]]) / 6,
-                          sum([points[36][1], points[37][1], points[38][1], points[39][1], points[40][1], points[41][1]]) / 6)
-        right_eye_center = (sum([points[42][0], points[43][0], points[44][0], points[45][0], points[46][0], points[47][0]]) / 6,
-                           sum([points[42][1], points[43][1], points[44][1], points[45][1], points[46][1], points[47][1]]) / 6)
-        self.face_measurements["göz_arası_mesafe"] = hypot(right_eye_center[0] - left_eye_center[0], right_eye_center[1] - left_eye_center[1])
+        left_eye_center = aligned[36:42].mean(axis=0)
+        right_eye_center = aligned[42:48].mean(axis=0)
+        self.face_measurements["göz_arası_mesafe"] = distance(right_eye_center, left_eye_center)
         
         # Burun uzunluğu
-        nose_top = points[27]
-        nose_bottom = points[33]
-        self.face_measurements["burun_uzunluğu"] = hypot(nose_bottom[0] - nose_top[0], nose_bottom[1] - nose_top[1])
+        self.face_measurements["burun_uzunluğu"] = distance(aligned[33], aligned[27])
         
         # Ağız genişliği
-        mouth_left = points[48]
-        mouth_right = points[54]
-        self.face_measurements["ağız_genişliği"] = hypot(mouth_right[0] - mouth_left[0], mouth_right[1] - mouth_left[1])
+        self.face_measurements["ağız_genişliği"] = distance(aligned[54], aligned[48])
         
         # Yüz genişliği
-        face_left = points[0]
-        face_right = points[16]
-        self.face_measurements["yüz_genişliği"] = hypot(face_right[0] - face_left[0], face_right[1] - face_left[1])
+        self.face_measurements["yüz_genişliği"] = distance(aligned[16], aligned[0])
         
         # Yüz yüksekliği
-        face_top = points[27]
-        face_bottom = points[8]
-        self.face_measurements["yüz_yüksekliği"] = hypot(face_bottom[0] - face_top[0], face_bottom[1] - face_top[1])
+        self.face_measurements["yüz_yüksekliği"] = distance(aligned[8], aligned[27])
     
     def display_measurements(self, frame, x, y):
         """Yüz ölçümlerini ekranda göster"""
@@ -965,275 +1074,206 @@ class FaceDetectionApp:
             return frame
         
         try:
-            # Yüz dikdörtgeni ve noktalarını kullanarak filtreyi uygula
-            x, y, w, h = face_rect
-            
             # Aktif filtreyi al
             filter_name = self.ar_filter_var.get()
             
             if filter_name == "Yok":
                 return frame
             
-            # Göz merkezlerini hesapla (gözlük filtresi için)
-            left_eye_center = (sum([points[36][0], points[37][0], points[38][0], points[39][0], points[40][0], points[41][0]]) // 6,
-                              sum([points[36][1], points[37][1], points[38][1], points[39][1], points[40][1], points[41][1]]) // 6)
-            right_eye_center = (sum([points[42][0], points[43][0], points[44][0], points[45][0], points[46][0], points[47][0]]) // 6,
-                               sum([points[42][1], points[43][1], points[44][1], points[45][1], points[46][1], points[47][1]]) // 6)
-            
-            # Burun noktası (şapka filtresi için)
-            nose_top = points[27]
-            
-            # Ağız merkezi (maske ve sakal filtresi için)
-            mouth_center = (sum([points[48][0], points[54][0]]) // 2,
-                           sum([points[48][1], points[54][1]]) // 2)
-            
-            # Filtreyi uygula
-            if filter_name == "Gözlük":
-                # Gözlük filtresini gözlerin üzerine yerleştir
-                eye_distance = right_eye_center[0] - left_eye_center[0]
-                filter_width = int(eye_distance * 2.5)
-                filter_height = int(filter_width * 0.5)
-                filter_x = left_eye_center[0] - int(filter_width * 0.2)
-                filter_y = left_eye_center[1] - int(filter_height * 0.5)
-                
-                frame = self.ar_filters.apply_filter(frame, filter_name, (filter_x, filter_y), (filter_width, filter_height))
-                
-            elif filter_name == "Şapka":
-                # Şapka filtresini başın üzerine yerleştir
-                filter_width = w * 2
-                filter_height = h
-                filter_x = x - w // 2
-                filter_y = y - h
-                
-                frame = self.ar_filters.apply_filter(frame, filter_name, (filter_x, filter_y), (filter_width, filter_height))
-                
-            elif filter_name == "Maske":
-                # Maske filtresini ağız ve burun üzerine yerleştir
-                filter_width = w
-                filter_height = h // 2
-                filter_x = x
-                filter_y = nose_top[1]
-                
-                frame = self.ar_filters.apply_filter(frame, filter_name, (filter_x, filter_y), (filter_width, filter_height))
-                
-            elif filter_name == "Sakal":
-                # Sakal filtresini çene üzerine yerleştir
-                filter_width = w
-                filter_height = h // 2
-                filter_x = x
-                filter_y = mouth_center[1]
-                
-                frame = self.ar_filters.apply_filter(frame, filter_name, (filter_x, filter_y), (filter_width, filter_height))
-                
-            elif filter_name == "Hayvan Kulakları":
-                # Hayvan kulaklarını başın üzerine yerleştir
-                filter_width = w * 2
-                filter_height = h
-                filter_x = x - w // 2
-                filter_y = y - h // 2
-                
-                frame = self.ar_filters.apply_filter(frame, filter_name, (filter_x, filter_y), (filter_width, filter_height))
-                
-            elif filter_name == "Işık Efekti":
-                # Işık efektini yüzün etrafına yerleştir
-                filter_width = w * 2
-                filter_height = h * 2
-                filter_x = x - w // 2
-                filter_y = y - h // 2
-                
-                frame = self.ar_filters.apply_filter(frame, filter_name, (filter_x, filter_y), (filter_width, filter_height))
+            # Tüm bağlantı noktalarını landmark dizisinden bir kez hesapla
+            anchors = FaceAnchors(points)
             
-            return frame
+            return self.ar_filters.apply_filter(frame, points, anchors)
             
         except Exception as e:
             print(f"AR filtresi uygulanırken hata: {e}")
             return frame
     
-    def recognize_face(self, points):
-        """Basit yüz tanıma - yüz noktalarının konumlarını kullanarak"""
-        if not self.face_database or points is None or len(points) < 68:
-            return None
+    def query_face(self, points):
+        """En yakın kayıt ve mesafesi; eşik altında eşleşme yoksa (None, en yakın mesafe)"""
+        if len(self.face_index) == 0 or points is None or len(points) < 68:
+            return None, float('inf')
         
         # Yüz özelliklerini çıkar
         face_features = self.extract_face_features(points)
         
-        # En yakın eşleşmeyi bul
-        best_match = None
-        min_distance = float('inf')
+        # En yakın eşleşmeyi tek matris işlemiyle bul
+        matches = self.face_index.search(face_features, k=1)
+        if not matches:
+            return None, float('inf')
         
-        for face_id, stored_features in self.face_database.items():
-            distance = self.calculate_feature_distance(face_features, stored_features)
-            if distance < min_distance and distance < 100:  # Eşik değeri
-                min_distance = distance
-                best_match = face_id
-        
-        return best_match
+        face_id, distance = matches[0]
+        if distance >= self.recognition_threshold:  # Eşik değeri
+            return None, distance
+        return identity_of(face_id), distance
     
-    def extract_face_features(self, points):
-        """Yüz noktalarından özellik vektörü çıkar"""
-        features = []
-        
-        # Göz arası mesafe
-        left_eye_center = (sum([points[36][0], points[37][0], points[38][0], points[39][0], points[40][0], points[41][0]]) / 6,
-                          sum([points[36][1], points[37][1], points[38][1], points[39][1], points[40][1], points[41][1]]) / 6)
-        right_eye_center = (sum([points[42][0], points[43][0], points[44][0], points[45][0], points[46][0], points[47][0]]) / 6,
-                           sum([points[42][1], points[43][1], points[44][1], points[45][1], points[46][1], points[47][1]]) / 6)
-        eye_distance = hypot(right_eye_center[0] - left_eye_center[0], right_eye_center[1] - left_eye_center[1])
-        
-        # Normalize edilmiş noktalar (göz mesafesine göre)
-        normalized_points = []
-        for point in points:
-            normalized_points.append((point[0] / eye_distance, point[1] / eye_distance))
-        
-        # Özellik vektörü oluştur
-        for point in normalized_points:
-            features.append(point[0])
-            features.append(point[1])
-        
-        return features
+    def get_face_alignment(self, points):
+        """Yüzün standart şablona hizalaması - mevcut karenin tespiti için kare başına bir kez hesaplanır"""
+        if points is self.last_points:
+            return self.frame_ctx.cached("face_alignment", lambda: align_landmarks(points))
+        return align_landmarks(points)
     
-    def calculate_feature_distance(self, features1, features2):
-        """İki özellik vektörü arasındaki mesafeyi hesapla"""
-        if len(features1) != len(features2):
-            return float('inf')
-        
-        sum_squared_diff = 0
-        for i in range(len(features1)):
-            sum_squared_diff += (features1[i] - features2[i]) ** 2
-        
-        return np.sqrt(sum_squared_diff)
+    def extract_face_features(self, points):
+        """Yüz noktalarından konum, ölçek ve dönmeden bağımsız özellik vektörü çıkar"""
+        return self.get_face_alignment(points).features()
     
     def save_face_data(self):
-        """Mevcut yüzü veritabanına kaydet"""
+        """Mevcut yüzü veritabanına kaydet - kamera açıksa kare dizisinden çok örnekli kayıt"""
         if self.current_frame is None:
             messagebox.showinfo("Bilgi", "Kaydedilecek yüz yok!")
             return
         
+        if self.enrollment_session is not None:
+            messagebox.showinfo("Bilgi", "Kayıt zaten devam ediyor!")
+            return
+        
         # Yüz tespiti yap
         face_rect, points = self.detect_face(self.current_frame)
         if face_rect is None or points is None:
             messagebox.showinfo("Bilgi", "Kaydedilecek yüz tespit edilemedi!")
             return
         
-        # Yüz özelliklerini çıkar
-        face_features = self.extract_face_features(points)
-        
         # Yüz ID'si oluştur
-        face_id = f"Kişi_{len(self.face_database) + 1}"
+        identities = {identity_of(face_id) for face_id in self.face_index}
+        face_id = f"Kişi_{len(identities) + 1}"
         name = tk.simpledialog.askstring("İsim Girin", "Bu yüz için bir isim girin:")
         if name:
-            face_id = name
+            face_id = name.replace("#", "")  # "#" şablon ayırıcısıdır
         
-        # Veritabanına ekle
-        self.face_database[face_id] = face_features
+        if not self.is_running:
+            # Kamera kapalı: yalnızca mevcut kare
+            self.finish_enrollment(face_id, np.asarray([self.extract_face_features(points)], dtype=np.float32))
+            return
         
-        # Veritabanını kaydet
-        self.save_face_database()
+        # Sonraki karelerden örnek topla (process_frame içinde)
+        self.enrollment_session = EnrollmentSession(face_id, mode=self.enrollment_mode)
+        self.status_var.set(f"{face_id} kaydediliyor: başınızı hafifçe hareket ettirin...")
+    
+    def collect_enrollment_sample(self, points):
+        """Kayıt oturumuna bu karenin özelliklerini ekler; tamamlanınca şablonları kaydeder"""
+        session = self.enrollment_session
+        features = self.extract_face_features(points) if points is not None else None
+        if session.add_frame(features):
+            self.status_var.set(f"{session.identity} kaydediliyor: {len(session.samples)}/{session.target_samples}")
+        
+        if not (session.is_complete or session.is_expired):
+            return
+        
+        self.enrollment_session = None
+        templates = session.build_templates()
+        if templates is None:
+            messagebox.showinfo("Bilgi", "Yeterli yüz örneği toplanamadı, lütfen tekrar deneyin.")
+            self.status_var.set("Kayıt tamamlanamadı")
+            return
+        
+        self.finish_enrollment(session.identity, templates, len(session.samples), session.rejected)
+    
+    def finish_enrollment(self, identity, templates, sample_count=1, rejected=0):
+        """Kimliğin eski şablonlarını değiştirir; indeks ve depo artımlı güncellenir"""
+        try:
+            # Aynı kimliğin önceki şablonlarını kaldır
+            for face_id in [face_id for face_id in self.face_index if identity_of(face_id) == identity]:
+                self.face_index.remove(face_id)
+                self._write_face_store("remove", face_id)
+            
+            metadata = {"enrolled_at": datetime.now().isoformat(), "samples": sample_count, "rejected": rejected}
+            for i, template in enumerate(templates):
+                self.face_index.add(template_id(identity, i), template)
+                self._write_face_store("append", template_id(identity, i), template, metadata)
+            
+            # Günlük büyüdüyse sıkıştır
+            if not self.face_database_loading and self.face_store.needs_compaction():
+                self.save_face_database()
+        except Exception as e:
+            messagebox.showerror("Hata", f"Veritabanı kaydedilirken hata oluştu: {e}")
+            return
+        
+        self.recognition_cache.invalidate()
         
         # Listeyi güncelle
         self.update_recognition_list()
         
-        messagebox.showinfo("Başarılı", f"{face_id} veritabanına kaydedildi!")
+        self.status_var.set(f"{identity}: {sample_count} örnek, {rejected} aykırı elendi, {len(templates)} şablon")
+        messagebox.showinfo("Başarılı", f"{identity} veritabanına kaydedildi!")
     
     def save_face_database(self):
-        """Yüz veritabanını dosyaya kaydet"""
-        db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "face_database.pkl")
+        """Yüz veritabanını sıkıştırarak tek matris dosyasına yaz"""
+        if self.face_database_loading:
+            # İndeks henüz diskteki kayıtları içermiyor; birleştirmeden sonra yazılır
+            self.face_database_save_pending = True
+            return
         try:
-            with open(db_path, 'wb') as f:
-                pickle.dump(self.face_database, f)
-            self.status_var.set(f"Veritabanı kaydedildi: {len(self.face_database)} yüz")
+            self.face_store.compact(self.face_index.ids, self.face_index.matrix)
+            self.status_var.set(f"Veritabanı kaydedildi: {len(self.face_index)} yüz")
         except Exception as e:
             messagebox.showerror("Hata", f"Veritabanı kaydedilirken hata oluştu: {e}")
     
     def update_recognition_list(self):
         """Tanıma listesini güncelle"""
         self.recognition_listbox.delete(0, tk.END)
-        for face_id in self.face_database.keys():
-            self.recognition_listbox.insert(tk.END, face_id)
+        # Birden çok şablonu olan kimlikler bir kez listelenir
+        for identity in dict.fromkeys(identity_of(face_id) for face_id in self.face_index):
+            self.recognition_listbox.insert(tk.END, identity)
     
     def clear_face_database(self):
         """Yüz veritabanını temizle"""
         if messagebox.askyesno("Onay", "Tüm yüz veritabanını silmek istediğinizden emin misiniz?"):
-            self.face_database = {}
+            self.face_index.clear()
+            # Süren yüklemenin sonucu ve bekletilen yazımlar artık geçersiz
+            self.face_database_version += 1
+            self.face_database_loading = False
+            self.face_database_save_pending = False
+            self.pending_face_store_ops = []
+            self.recognition_cache.invalidate()
             self.save_face_database()
             self.update_recognition_list()
             messagebox.showinfo("Bilgi", "Veritabanı temizlendi!")
     
-    def process_lip_reading(self, frame):
-        """Dudak okuma işlemini gerçekleştir"""
-        # Yüz tespiti yap
-        face_rect, points = self.detect_face(frame)
-        
+    def process_lip_reading(self, face_rect=None, points=None):
+        """Karenin dudak okumasını akışa verir; yüz kaybolunca dudak geçmişi sıfırlanır"""
         if face_rect is None or points is None:
+            if self.last_lip_result is not None:
+                self.lip_reading_stream.reset()
+                self.last_lip_result = None
             return
         
-        try:
-            # Dudak bölgesini çıkar
-            lip_result = self.lip_reader.extract_lip_region(frame, points)
-            
-            if lip_result is None:
-                return
-                
-            if len(lip_result) == 3:  # ImprovedLipReading kullanılıyor
-                lip_region, lip_bbox, lip_points = lip_result
-                
-                # Dudak şeklini analiz et
-                lip_shape, confidence = self.lip_reader.analyze_lip_shape(lip_points)
-                
-                # Dudak özelliklerini çıkar
-                lip_features = self.lip_reader.extract_lip_features(lip_region, lip_points)
-                
-                # Kelime tahmin et
-                current_time = time.time()
-                if current_time - self.lip_reader.last_prediction_time > self.lip_reader.prediction_cooldown:
-                    predicted_word, word_confidence = self.lip_reader.predict_word(lip_features)
-                    
-                    if predicted_word and word_confidence > 0.6:  # Güven eşiği
-                        self.lip_reader.last_prediction_time = current_time
-                        self.lip_reader.word_buffer = predicted_word
-                        self.lip_reader.confidence = word_confidence
-                        
-                        # Sonuçları göster
-                        self.lip_reading_label.config(text=f"Okunan: {predicted_word}")
-                        self.lip_reading_confidence["value"] = word_confidence * 100
-                        
-                        # Geçmişe ekle
-                        if hasattr(self.lip_reader, 'lip_reading_history'):
-                            self.lip_reader.lip_reading_history.append((predicted_word, word_confidence))
-                            if len(self.lip_reader.lip_reading_history) > 10:  # Son 10 tahmini tut
-                                self.lip_reader.lip_reading_history.pop(0)
-            else:  # Temel LipReading kullanılıyor
-                lip_region, lip_bbox = lip_result
-                
-                # Dudak şeklini analiz et
-                lip_shape, confidence = self.lip_reader.analyze_lip_shape(points[48:68])
-                
-                # Kelime tahmin et
-                phonemes, phoneme_confidence = self.lip_reader.predict_phoneme(lip_shape, confidence)
-                
-                if phonemes:
-                    # Fonem geçmişini güncelle
-                    self.lip_reader.lip_history.append((phonemes[0], phoneme_confidence))
-                    
-                    # Kelime tahmin et
-                    predicted_word = self.lip_reader.predict_word_from_phonemes()
-                    
-                    if predicted_word:
-                        # Sonuçları göster
-                        self.lip_reading_label.config(text=f"Okunan: {predicted_word}")
-                        self.lip_reading_confidence["value"] = self.lip_reader.confidence * 100
-            
-            # Dudak bölgesini çerçeve içine al
-            if lip_bbox:
-                x_min, y_min, x_max, y_max = lip_bbox
-                cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 255), 2)
-                
-                # Dudak şeklini göster
-                cv2.putText(frame, f"Dudak: {lip_shape} ({confidence:.2f})", 
-                            (x_min, y_min - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-        
-        except Exception as e:
-            print(f"Dudak okuma hatası: {e}")
+        result = self.lip_reading_stream.push(self.frame_ctx, points)
+        if result is not None:
+            self.last_lip_result = result
+    
+    def _post_lip_reading_result(self, result):
+        """Akış iş parçacığından çağrılır; tamamlanan kelimeyi kuyruğa koyar (Tk çağrısı yapılmaz)"""
+        if result.word:
+            self.lip_reading_queue.put(result)
+    
+    def _drain_lip_reading_queue(self):
+        """Kuyruktaki kelimeleri ana iş parçacığında gösterir (update_frame'den çağrılır)"""
+        while True:
+            try:
+                result = self.lip_reading_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._on_lip_reading_result(result)
+    
+    def _on_lip_reading_result(self, result):
+        """Okunan kelimeyi gösterir (ana iş parçacığı)"""
+        self.last_predicted_word = result.word
+        self.lip_reading_label.config(text=f"Okunan: {result.word}")
+        self.lip_reading_confidence["value"] = result.confidence * 100
+        
+        # Geçmişe ekle
+        self.lip_reading_history.append((result.word, result.confidence))
+        if len(self.lip_reading_history) > 10:  # Son 10 tahmini tut
+            self.lip_reading_history.pop(0)
+    
+    def draw_lip_reading(self, frame, result):
+        """Dudak bölgesini ve şeklini çizer"""
+        x_min, y_min, x_max, y_max = result.bbox
+        cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 255), 2)
+        
+        # Dudak şeklini göster
+        cv2.putText(frame, f"Dudak: {result.shape} ({result.shape_confidence:.2f})", 
+                    (x_min, y_min - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
     
     def update_model_rotation(self, value):
         """3D model döndürme değerini güncelle"""
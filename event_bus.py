@@ -0,0 +1,150 @@
+import json
+import queue
+import socket
+import threading
+import time
+
+class Event:
+    """Zaman damgalı tespit olayı (blink, yawn, gaze, gesture, fatigue)"""
+    __slots__ = ("type", "timestamp", "data")
+
+    def __init__(self, event_type, data=None, timestamp=None):
+        self.type = event_type
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.data = data or {}
+
+    def to_dict(self):
+        return {"type": self.type, "timestamp": self.timestamp, "data": self.data}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def __repr__(self):
+        return f"Event({self.type!r}, {self.data!r}, timestamp={self.timestamp:.3f})"
+
+class JSONLSink:
+    """Olayları satır başına bir JSON nesnesi olarak dosyaya ekler"""
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def write(self, events):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("".join(event.to_json() + "\n" for event in events))
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class SocketSink:
+    """Olayları yerel UDP soketine JSON satırları olarak gönderir (dinleyici yoksa kayıp olur)"""
+    def __init__(self, host="127.0.0.1", port=5055):
+        self.address = (host, port)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def write(self, events):
+        for event in events:
+            try:
+                self._socket.sendto(event.to_json().encode("utf-8"), self.address)
+            except OSError as e:
+                print(f"Olay gönderme hatası: {e}")
+                return
+
+    def close(self):
+        self._socket.close()
+
+class CallbackSink:
+    """Olayları bir Python fonksiyonuna iletir; isteğe bağlı olarak türe göre süzer"""
+    def __init__(self, callback, event_types=None):
+        self.callback = callback
+        self.event_types = set(event_types) if event_types else None
+
+    def write(self, events):
+        for event in events:
+            if self.event_types is None or event.type in self.event_types:
+                self.callback(event)
+
+    def close(self):
+        pass
+
+class EventBus:
+    """Süreç içi olay yolu - yayınlama kuyruğa ekler, hedeflere arka plan iş parçacığı yazar"""
+    def __init__(self, flush_interval=0.1, max_queue=10000):
+        self.flush_interval = flush_interval
+        self.sinks = []
+        self.dropped = 0  # Kuyruk dolduğunda atılan olay sayısı
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._running = False
+        self._thread = None
+        self._sink_lock = threading.Lock()
+
+    def add_sink(self, sink):
+        with self._sink_lock:
+            self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink):
+        with self._sink_lock:
+            if sink in self.sinks:
+                self.sinks.remove(sink)
+                sink.close()
+
+    def publish(self, event_type, data=None, timestamp=None):
+        """Olayı kuyruğa ekler - görüntü işleme döngüsünü bloklamaz"""
+        if not self.sinks:
+            return
+        try:
+            self._queue.put_nowait(Event(event_type, data, timestamp))
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        """Arka plan boşaltma iş parçacığını başlatır"""
+        if self._running:
+            return False
+        self._running = True
+        self._thread = threading.Thread(target=self._flush_loop)
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """İş parçacığını durdurur, kalan olayları yazar ve hedefleri kapatır"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        self.flush()
+        with self._sink_lock:
+            for sink in self.sinks:
+                sink.close()
+
+    def flush(self):
+        """Kuyruktaki tüm olayları tek parti halinde hedeflere yazar"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return 0
+
+        with self._sink_lock:
+            sinks = list(self.sinks)
+        for sink in sinks:
+            try:
+                sink.write(batch)
+            except Exception as e:
+                print(f"Olay hedefi hatası: {e}")
+        return len(batch)
+
+    def _flush_loop(self):
+        """Olayları flush_interval aralıklarla partiler halinde yazar"""
+        while self._running:
+            time.sleep(self.flush_interval)
+            self.flush()
@@ -0,0 +1,61 @@
+import numpy as np
+from face_landmarks import synthesize_landmarks
+
+# Özellik vektörü biçimi değiştiğinde artırılır (kayıtlı şablonlar eski sürümle karşılaştırılamaz)
+FEATURE_VERSION = 2
+
+def _build_canonical_template():
+    """Standart yüz şablonu: merkezi orijinde, noktaların RMS uzaklığı 1"""
+    points = synthesize_landmarks(0, 0, 1000, 1000).astype(np.float64)
+    points -= points.mean(axis=0)
+    points /= np.sqrt(np.mean(np.sum(points ** 2, axis=1)))
+    return points
+
+CANONICAL_TEMPLATE = _build_canonical_template()
+
+class FaceAlignment:
+    """Landmark'ları standart şablona taşıyan benzerlik dönüşümü (ölçek, dönme, öteleme)"""
+    def __init__(self, scale, rotation, translation, aligned):
+        self.scale = scale
+        self.rotation = rotation  # 2x2
+        self.translation = translation
+        self.aligned = aligned  # (68, 2) float32 şablon koordinatlarında noktalar
+
+        # cv2.warpAffine ile kullanılabilir 2x3 matris (kare -> şablon)
+        self.matrix = np.hstack([scale * rotation, translation[:, np.newaxis]]).astype(np.float32)
+
+    @property
+    def angle(self):
+        """Yüzün düzlem içi dönme açısı (derece)"""
+        return float(np.degrees(np.arctan2(self.rotation[1, 0], self.rotation[0, 0])))
+
+    def to_pixels(self, distance):
+        """Şablon birimindeki uzunluğu kare piksellerine çevirir"""
+        return distance / self.scale
+
+    def features(self):
+        """Tanıma için konum, ölçek ve dönmeden bağımsız float32 özellik vektörü"""
+        return self.aligned.reshape(-1)
+
+def align_landmarks(points, template=CANONICAL_TEMPLATE):
+    """Procrustes (Umeyama) ile noktaları şablona en iyi oturtan benzerlik dönüşümü"""
+    source = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    source_mean = source.mean(axis=0)
+    template_mean = template.mean(axis=0)
+    centered = source - source_mean
+
+    covariance = (template - template_mean).T @ centered / len(source)
+    u, singular, vt = np.linalg.svd(covariance)
+
+    # Yansımayı engelle
+    correction = np.ones(2)
+    if np.linalg.det(u) * np.linalg.det(vt) < 0:
+        correction[1] = -1.0
+
+    rotation = u @ np.diag(correction) @ vt
+    variance = np.mean(np.sum(centered ** 2, axis=1))
+    scale = float(np.sum(singular * correction) / max(variance, 1e-12))
+    translation = template_mean - scale * rotation @ source_mean
+
+    aligned = (scale * centered @ rotation.T + template_mean).astype(np.float32)
+    return FaceAlignment(scale, rotation, translation, aligned)
@@ -0,0 +1,85 @@
+import numpy as np
+
+# Bir kimliğin birden çok şablonu indekste "isim#2", "isim#3" ... olarak tutulur
+TEMPLATE_SEPARATOR = "#"
+
+def template_id(identity, index):
+    """Kimliğin index. şablonu için indeks anahtarı (ilk şablon kimliğin kendisi)"""
+    return identity if index == 0 else f"{identity}{TEMPLATE_SEPARATOR}{index + 1}"
+
+def identity_of(face_id):
+    """İndeks anahtarından kimlik adı"""
+    return face_id.split(TEMPLATE_SEPARATOR, 1)[0]
+
+class EnrollmentSession:
+    """Kare dizisinden çok örnekli kayıt - aykırı örnekleri eler, ortalama şablon veya örnekler üretir"""
+    def __init__(self, identity, target_samples=15, min_samples=5, sample_interval=2, max_frames=90,
+                 mode="mean", max_exemplars=3, outlier_threshold=3.0):
+        self.identity = identity
+        self.target_samples = target_samples
+        self.min_samples = min_samples
+        self.sample_interval = sample_interval  # Ardışık kareler neredeyse aynı: her N karede bir örnek
+        self.max_frames = max_frames  # Bu kadar karede tamamlanmazsa oturum biter
+        self.mode = mode  # "mean" veya "exemplars"
+        self.max_exemplars = max_exemplars
+        self.outlier_threshold = outlier_threshold  # Medyan mutlak sapma (MAD) katı
+
+        self.samples = []
+        self.frames = 0
+        self.rejected = 0
+
+    @property
+    def is_complete(self):
+        return len(self.samples) >= self.target_samples
+
+    @property
+    def is_expired(self):
+        return self.frames >= self.max_frames
+
+    def add_frame(self, features):
+        """Karedeki yüz özelliklerini (yüz yoksa None) işler; örnek alındıysa True"""
+        self.frames += 1
+        if features is None or (self.frames - 1) % self.sample_interval != 0:
+            return False
+        self.samples.append(np.asarray(features, dtype=np.float32).reshape(-1))
+        return True
+
+    def _inliers(self):
+        """Medyan vektöre uzaklığı medyan + k * MAD'ı aşan örnekleri eler"""
+        samples = np.stack(self.samples)
+        if len(samples) < 4:
+            return samples  # Çok az örnekte sapma tahmini güvenilmez
+
+        median = np.median(samples, axis=0)
+        distances = np.linalg.norm(samples - median, axis=1)
+
+        center = np.median(distances)
+        spread = 1.4826 * np.median(np.abs(distances - center))  # Normal dağılımda std eşdeğeri
+        keep = distances <= center + self.outlier_threshold * max(spread, 1e-6)
+
+        self.rejected = int(np.count_nonzero(~keep))
+        return samples[keep]
+
+    def build_templates(self):
+        """(K, D) şablon matrisi; yeterli örnek yoksa None"""
+        if len(self.samples) < self.min_samples:
+            return None
+
+        inliers = self._inliers()
+        if len(inliers) < self.min_samples:
+            return None
+
+        mean = inliers.mean(axis=0)
+        if self.mode != "exemplars":
+            return mean[np.newaxis]
+
+        # En uzak nokta seçimi: ortalamaya en yakın örnekten başlayıp çeşitliliği artır
+        chosen = [int(np.argmin(np.linalg.norm(inliers - mean, axis=1)))]
+        nearest = np.linalg.norm(inliers - inliers[chosen[0]], axis=1)
+        while len(chosen) < min(self.max_exemplars, len(inliers)):
+            candidate = int(np.argmax(nearest))
+            if nearest[candidate] <= 0:
+                break
+            chosen.append(candidate)
+            nearest = np.minimum(nearest, np.linalg.norm(inliers - inliers[candidate], axis=1))
+        return inliers[chosen]
@@ -0,0 +1,407 @@
+import time
+import numpy as np
+
+class FaceIndex:
+    """Yüz özellik vektörleri için bitişik (N, D) float32 matris ve kimlik dizisi"""
+    def __init__(self, dim=None, initial_capacity=64):
+        self.dim = dim
+        self._initial_capacity = initial_capacity
+        self.clear()
+
+    def clear(self):
+        """Tüm kayıtları siler"""
+        self.ids = []
+        self._positions = {}  # Kimlik -> satır
+        self._count = 0
+        self._matrix = None
+        self._norms = None  # Satırların kare normları (||b||²)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, face_id):
+        return face_id in self._positions
+
+    def __iter__(self):
+        return iter(list(self.ids))
+
+    @property
+    def matrix(self):
+        """Kayıtlı özellikler (N, D) - kopyasız görünüm"""
+        if self._matrix is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self._matrix[:self._count]
+
+    def _reserve(self, count):
+        """Kapasiteyi gerekirse iki katına çıkarır (eklemeler amortize O(D))"""
+        capacity = 0 if self._matrix is None else len(self._matrix)
+        if count <= capacity:
+            return
+
+        new_capacity = max(self._initial_capacity, capacity * 2, count)
+        matrix = np.empty((new_capacity, self.dim), dtype=np.float32)
+        norms = np.empty(new_capacity, dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:self._count] = self._matrix[:self._count]
+            norms[:self._count] = self._norms[:self._count]
+        self._matrix = matrix
+        self._norms = norms
+
+    def _as_vector(self, features):
+        vector = np.asarray(features, dtype=np.float32).reshape(-1)
+        if self.dim is None:
+            self.dim = len(vector)
+        elif len(vector) != self.dim:
+            raise ValueError(f"Özellik boyutu {len(vector)}, beklenen {self.dim}")
+        return vector
+
+    def load_matrix(self, face_ids, matrix):
+        """İndeksi mevcut (N, D) matrisle değiştirir - kopyalamaz (ilk büyümede kopyalanır)"""
+        self.clear()
+        face_ids = list(face_ids)
+        if not face_ids:
+            return
+
+        self.dim = matrix.shape[1]
+        self._matrix = matrix
+        self._norms = np.einsum("ij,ij->i", matrix, matrix)
+        self.ids = face_ids
+        self._positions = {face_id: row for row, face_id in enumerate(face_ids)}
+        self._count = len(face_ids)
+
+    def add(self, face_id, features):
+        """Kaydı ekler; kimlik zaten varsa özelliklerini günceller. Satır indeksini döndürür"""
+        vector = self._as_vector(features)
+
+        row = self._positions.get(face_id)
+        if row is None:
+            self._reserve(self._count + 1)
+            row = self._count
+            self._count += 1
+            self.ids.append(face_id)
+            self._positions[face_id] = row
+
+        self._matrix[row] = vector
+        self._norms[row] = np.dot(vector, vector)
+        return row
+
+    def add_many(self, face_ids, features):
+        """Birden çok kaydı tek seferde ekler"""
+        face_ids = list(face_ids)
+        features = np.asarray(features, dtype=np.float32).reshape(len(face_ids), -1)
+        for face_id, vector in zip(face_ids, features):
+            self.add(face_id, vector)
+
+    def get(self, face_id):
+        row = self._positions.get(face_id)
+        if row is None:
+            return None
+        return self._matrix[row]
+
+    def remove(self, face_id):
+        """Kaydı siler - son satır boşalan yere taşınır"""
+        row = self._positions.pop(face_id, None)
+        if row is None:
+            return False
+
+        last = self._count - 1
+        if row != last:
+            self._matrix[row] = self._matrix[last]
+            self._norms[row] = self._norms[last]
+            moved_id = self.ids[last]
+            self.ids[row] = moved_id
+            self._positions[moved_id] = row
+
+        self.ids.pop()
+        self._count -= 1
+        return True
+
+    def items(self):
+        """(kimlik, özellik) çiftleri"""
+        return [(face_id, self._matrix[row]) for row, face_id in enumerate(self.ids)]
+
+    def distances(self, queries):
+        """(Q, D) sorgular ile tüm kayıtlar arası Öklid mesafeleri (Q, N)
+
+        ||a - b||² = ||a||² - 2ab + ||b||² açılımı ile tek matris çarpımı (BLAS)
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        query_norms = np.einsum("ij,ij->i", queries, queries)
+        squared = query_norms[:, np.newaxis] - 2.0 * (queries @ self.matrix.T) + self._norms[:self._count]
+        return np.sqrt(np.maximum(squared, 0.0))
+
+    def search(self, features, k=1, max_distance=None):
+        """En yakın k kaydı [(kimlik, mesafe), ...] olarak yakından uzağa döndürür"""
+        if self._count == 0:
+            return []
+
+        distances = self.distances(self._as_vector(features))[0]
+        return self._top_k(distances, k, max_distance)
+
+    def search_batch(self, queries, k=1, max_distance=None):
+        """Birden çok sorgu için search - her sorgu için bir sonuç listesi"""
+        if self._count == 0:
+            return [[] for _ in range(len(queries))]
+        return [self._top_k(row, k, max_distance) for row in self.distances(queries)]
+
+    def _top_k(self, distances, k, max_distance, rows=None):
+        """Tam sıralama yerine argpartition ile en küçük k mesafe (rows: aday satır indeksleri)"""
+        k = min(k, len(distances))
+        if k < len(distances):
+            candidates = np.argpartition(distances, k - 1)[:k]
+        else:
+            candidates = np.arange(len(distances))
+        candidates = candidates[np.argsort(distances[candidates])]
+
+        results = []
+        for candidate in candidates:
+            distance = float(distances[candidate])
+            if max_distance is not None and distance >= max_distance:
+                break
+            row = candidate if rows is None else rows[candidate]
+            results.append((self.ids[row], distance))
+        return results
+
+class IVFIndex(FaceIndex):
+    """Ters dosya (IVF) yaklaşık en yakın komşu indeksi - k-means bölümlerinde yalnızca nprobe liste taranır
+
+    Kayıt sayısı min_train_size altındayken tam (FaceIndex) arama yapılır.
+    """
+    def __init__(self, dim=None, n_lists=None, nprobe=8, min_train_size=2000, rebuild_factor=2.0,
+                 kmeans_iterations=10, initial_capacity=64, seed=0):
+        self.n_lists = n_lists  # None: sqrt(N)
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.rebuild_factor = rebuild_factor  # Eğitimden bu yana bu oranda büyüyünce yeniden kur
+        self.kmeans_iterations = kmeans_iterations
+        self._rng = np.random.default_rng(seed)
+        super().__init__(dim, initial_capacity)
+
+    def clear(self):
+        super().clear()
+        self.centroids = None
+        self._centroid_norms = None
+        self._assignments = []  # Satır -> liste
+        self._lists = []  # Liste -> satırlar
+        self._list_arrays = []  # Liste -> satır dizisi önbelleği (değişince None)
+        self.trained_size = 0
+        self.last_build_seconds = 0.0
+        self.last_recall = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self._query_count = 0
+        self._candidate_count = 0
+        self._query_seconds = 0.0
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def _nearest_lists(self, vectors):
+        """Her vektör için en yakın merkez (||q||² sabit olduğundan atlanır)"""
+        scores = self._centroid_norms - 2.0 * (vectors @ self.centroids.T)
+        return np.argmin(scores, axis=1)
+
+    def _append_to_list(self, row, list_id):
+        self._lists[list_id].append(row)
+        self._list_arrays[list_id] = None
+
+    def _remove_from_list(self, row, list_id):
+        self._lists[list_id].remove(row)
+        self._list_arrays[list_id] = None
+
+    def _list_rows(self, list_id):
+        rows = self._list_arrays[list_id]
+        if rows is None:
+            rows = np.array(self._lists[list_id], dtype=np.int64)
+            self._list_arrays[list_id] = rows
+        return rows
+
+    def build(self):
+        """Merkezleri k-means ile yeniden öğrenir ve tüm satırları listelere atar"""
+        start = time.perf_counter()
+        count = len(self)
+        if count == 0:
+            self.centroids = None
+            return
+
+        n_lists = self.n_lists or int(np.sqrt(count))
+        n_lists = max(1, min(n_lists, count))
+
+        # Eğitim örneklemi (liste başına en fazla 64 nokta)
+        sample_size = min(count, n_lists * 64)
+        sample = self.matrix[self._rng.choice(count, sample_size, replace=False)]
+        centroids = sample[self._rng.choice(sample_size, n_lists, replace=False)].copy()
+
+        for _ in range(self.kmeans_iterations):
+            norms = np.einsum("ij,ij->i", centroids, centroids)
+            labels = np.argmin(norms - 2.0 * (sample @ centroids.T), axis=1)
+
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            sizes = np.bincount(labels, minlength=n_lists)
+            filled = sizes > 0  # Boş kalan listeler eski merkezini korur
+            centroids[filled] = sums[filled] / sizes[filled, np.newaxis]
+
+        self.centroids = centroids
+        self._centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+
+        # Tüm satırları parçalar halinde ata
+        assignments = np.empty(count, dtype=np.int64)
+        for begin in range(0, count, 8192):
+            assignments[begin:begin + 8192] = self._nearest_lists(self.matrix[begin:begin + 8192])
+
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+        self._list_arrays = [order[bounds[i]:bounds[i + 1]] for i in range(n_lists)]
+        self._lists = [rows.tolist() for rows in self._list_arrays]
+        self._assignments = assignments.tolist()
+
+        self.trained_size = count
+        self.last_build_seconds = time.perf_counter() - start
+
+    def load_matrix(self, face_ids, matrix):
+        super().load_matrix(face_ids, matrix)
+        self._maybe_build()
+
+    def _maybe_build(self):
+        """Henüz eğitilmediyse veya yeterince büyüdüyse yeniden kurar"""
+        if self.is_trained:
+            if len(self) >= self.rebuild_factor * self.trained_size:
+                self.build()
+        elif len(self) >= self.min_train_size:
+            self.build()
+
+    def add(self, face_id, features):
+        existing = face_id in self
+        row = super().add(face_id, features)
+
+        if self.is_trained:
+            list_id = int(self._nearest_lists(self._matrix[row:row + 1])[0])
+            if existing:
+                old_list = self._assignments[row]
+                if old_list != list_id:
+                    self._remove_from_list(row, old_list)
+                    self._append_to_list(row, list_id)
+                    self._assignments[row] = list_id
+            else:
+                self._assignments.append(list_id)
+                self._append_to_list(row, list_id)
+
+        self._maybe_build()
+        return row
+
+    def add_many(self, face_ids, features):
+        """Toplu ekleme - yeni satırlar sonunda tek seferde listelere atanır"""
+        face_ids = list(face_ids)
+        features = np.asarray(features, dtype=np.float32).reshape(len(face_ids), -1)
+        for face_id, vector in zip(face_ids, features):
+            if face_id in self:
+                self.add(face_id, vector)  # Güncelleme: liste değişebilir
+            else:
+                FaceIndex.add(self, face_id, vector)
+
+        # Listeye atanmamış satırlar (eğitilmiş indekste)
+        if self.is_trained and len(self._assignments) < len(self):
+            first = len(self._assignments)
+            list_ids = self._nearest_lists(self._matrix[first:len(self)]).tolist()
+            self._assignments.extend(list_ids)
+            for row, list_id in enumerate(list_ids, start=first):
+                self._append_to_list(row, list_id)
+
+        self._maybe_build()
+
+    def remove(self, face_id):
+        row = self._positions.get(face_id)
+        if row is None:
+            return False
+
+        if self.is_trained:
+            # FaceIndex son satırı boşalan yere taşır; listeler de aynı şekilde güncellenir
+            last = len(self) - 1
+            self._remove_from_list(row, self._assignments[row])
+            if row != last:
+                moved_list = self._assignments[last]
+                rows = self._lists[moved_list]
+                rows[rows.index(last)] = row
+                self._list_arrays[moved_list] = None
+                self._assignments[row] = moved_list
+            self._assignments.pop()
+
+        return super().remove(face_id)
+
+    def search(self, features, k=1, max_distance=None):
+        """Yaklaşık en yakın k kayıt - yalnızca en yakın nprobe listedeki adaylar taranır"""
+        if not self.is_trained:
+            return super().search(features, k, max_distance)
+
+        start = time.perf_counter()
+        query = self._as_vector(features)
+
+        # En yakın merkezler
+        scores = self._centroid_norms - 2.0 * (self.centroids @ query)
+        nprobe = min(self.nprobe, len(scores))
+        probe = np.argpartition(scores, nprobe - 1)[:nprobe]
+
+        rows = np.concatenate([self._list_rows(list_id) for list_id in probe])
+        results = []
+        if len(rows) > 0:
+            candidates = self._matrix[rows]
+            squared = self._norms[rows] - 2.0 * (candidates @ query) + np.dot(query, query)
+            results = self._top_k(np.sqrt(np.maximum(squared, 0.0)), k, max_distance, rows)
+
+        self._query_count += 1
+        self._candidate_count += len(rows)
+        self._query_seconds += time.perf_counter() - start
+        return results
+
+    def search_batch(self, queries, k=1, max_distance=None):
+        if not self.is_trained:
+            return super().search_batch(queries, k, max_distance)
+        return [self.search(query, k, max_distance) for query in queries]
+
+    def measure_recall(self, queries=None, k=1, sample_size=100, noise=0.05):
+        """Tam aramaya göre geri çağırma oranı (recall@k)
+
+        Sorgu verilmezse kayıtlı vektörlere özellik ölçeğine göre gürültü eklenerek örneklenir.
+        """
+        if len(self) == 0:
+            return None
+
+        if queries is None:
+            sample = self._rng.choice(len(self), min(sample_size, len(self)), replace=False)
+            scale = float(self.matrix.std()) * noise
+            queries = self.matrix[sample] + self._rng.normal(0.0, scale, (len(sample), self.dim)).astype(np.float32)
+
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        exact = FaceIndex.search_batch(self, queries, k)
+        approximate = self.search_batch(queries, k)
+
+        hits = 0
+        total = 0
+        for expected, found in zip(exact, approximate):
+            found_ids = {face_id for face_id, _ in found}
+            hits += sum(1 for face_id, _ in expected if face_id in found_ids)
+            total += len(expected)
+
+        self.last_recall = hits / max(total, 1)
+        return self.last_recall
+
+    def stats(self):
+        """İndeks boyutu, liste dengesi ve sorgu gecikmesi özetleri"""
+        list_sizes = [len(rows) for rows in self._lists]
+        queries = max(self._query_count, 1)
+        return {
+            "size": len(self),
+            "trained": self.is_trained,
+            "trained_size": self.trained_size,
+            "n_lists": len(self._lists),
+            "nprobe": self.nprobe,
+            "largest_list": max(list_sizes) if list_sizes else 0,
+            "queries": self._query_count,
+            "avg_candidates": self._candidate_count / queries,
+            "avg_latency_ms": 1000.0 * self._query_seconds / queries,
+            "last_build_seconds": self.last_build_seconds,
+            "recall": self.last_recall
+        }
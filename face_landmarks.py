@@ -0,0 +1,107 @@
+import numpy as np
+
+class FaceLandmarks:
+    """68 noktalı landmark kabı - bitişik int32 dizi, kare ve yüz-yerel koordinatlar"""
+    def __init__(self, points, origin=(0, 0)):
+        # Kare (global) koordinatları: (68, 2) bitişik int32
+        self.points = np.ascontiguousarray(points, dtype=np.int32).reshape(-1, 2)
+        # Yüz bölgesinin sol üst köşesi (yüz-yerel koordinatların başlangıcı)
+        self.origin = np.array(origin, dtype=np.int32)
+        self._local = None
+
+    @property
+    def local(self):
+        """Yüz bölgesine göre koordinatlar - ilk istendiğinde bir kez hesaplanır"""
+        if self._local is None:
+            self._local = self.points - self.origin
+        return self._local
+
+    def __len__(self):
+        return len(self.points)
+
+    def __getitem__(self, index):
+        # Tek nokta: OpenCV çizim fonksiyonlarıyla uyumlu (x, y) tuple
+        if isinstance(index, (int, np.integer)):
+            x, y = self.points[index]
+            return int(x), int(y)
+        # Dilim: kopyasız dizi görünümü
+        return self.points[index]
+
+    def __iter__(self):
+        for x, y in self.points.tolist():
+            yield x, y
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None or dtype == self.points.dtype:
+            return self.points
+        return self.points.astype(dtype)
+
+def synthesize_landmarks(x, y, w, h, eye_centers=None):
+    """Yüz dikdörtgeni (ve varsa göz merkezleri) için 68 noktalı landmark'ları tahmin eder"""
+    points = np.empty((68, 2), dtype=np.int32)
+
+    # Çene noktaları (0-16)
+    steps = np.arange(17)
+    points[0:17, 0] = x + (steps * w / 16).astype(np.int32)
+    points[0:17, 1] = y + h - int(h / 8)
+
+    # Kaş noktaları (17-26)
+    steps = np.arange(5)
+    points[17:22, 0] = x + int(w / 4) + (steps * w / 10).astype(np.int32)
+    points[22:27, 0] = x + int(w / 2) + (steps * w / 10).astype(np.int32)
+    points[17:27, 1] = y + int(h / 4)
+
+    # Burun noktaları (27-35)
+    steps = np.arange(9)
+    points[27:36, 0] = x + int(w / 2)
+    points[27:36, 1] = y + int(h / 3) + (steps * h / 15).astype(np.int32)
+
+    # Göz noktaları (36-47) - göz merkezleri verilmediyse tahmin et
+    if eye_centers is None:
+        eye_centers = [(x + int(w / 3), y + int(h / 3)), (x + int(2 * w / 3), y + int(h / 3))]
+
+    angles = np.radians(np.arange(6) * 60)
+    eye_offsets = np.stack([(w / 12 * np.cos(angles)).astype(np.int32),
+                            (w / 12 * np.sin(angles)).astype(np.int32)], axis=1)
+    points[36:42] = eye_offsets + eye_centers[0]
+    points[42:48] = eye_offsets + eye_centers[1]
+
+    # Ağız noktaları (48-67)
+    mouth_center = (x + int(w / 2), y + int(3 * h / 4))
+
+    # Dış dudak
+    angles = np.radians(np.arange(12) * 30)
+    points[48:60, 0] = mouth_center[0] + (w / 6 * np.cos(angles)).astype(np.int32)
+    points[48:60, 1] = mouth_center[1] + (w / 6 * np.sin(angles)).astype(np.int32)
+
+    # İç dudak
+    angles = np.radians(np.arange(8) * 45)
+    points[60:68, 0] = mouth_center[0] + (w / 10 * np.cos(angles)).astype(np.int32)
+    points[60:68, 1] = mouth_center[1] + (w / 10 * np.sin(angles)).astype(np.int32)
+
+    return points
+
+def detect_landmarks(gray, face_cascade, eye_cascade):
+    """Gri görüntüde ilk yüzü bulur ve 68 noktalı landmark'ları tahmin eder"""
+    # Yüzleri tespit et
+    faces = face_cascade.detectMultiScale(gray, 1.1, 4)
+
+    if len(faces) == 0:
+        return None, None
+
+    # İlk tespit edilen yüzü al
+    (x, y, w, h) = [int(v) for v in faces[0]]
+
+    # Gözleri tespit et (daha doğru landmark tespiti için)
+    roi_gray = gray[y:y+h, x:x+w]
+    eyes = eye_cascade.detectMultiScale(roi_gray)
+
+    # Eğer gözler tespit edildiyse, gerçek göz konumlarını kullan
+    eye_centers = None
+    if len(eyes) >= 2:
+        # Gözleri sol ve sağ olarak sırala
+        eyes = sorted(eyes, key=lambda e: e[0])
+        eye_centers = [(x + ex + ew // 2, y + ey + eh // 2) for ex, ey, ew, eh in eyes[:2]]
+
+    points = synthesize_landmarks(x, y, w, h, eye_centers)
+    return (x, y, w, h), FaceLandmarks(points, origin=(x, y))
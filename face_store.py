@@ -0,0 +1,240 @@
+import json
+import os
+import pickle
+import numpy as np
+
+class FaceStore:
+    """Yüz veritabanı deposu - bellek eşlemeli float32 özellik matrisi, kimlik/üst veri dosyası ve ekleme günlüğü
+
+    Dizin içeriği:
+        features-<n>.npy - sıkıştırılmış (N, D) float32 matris (açılışta bellek eşlemeli okunur)
+        ids.json         - matris dosya adı, satır sırasıyla kimlikler ve kimlik başına üst veri
+        journal.f32    - son sıkıştırmadan beri eklenen vektörler (ham float32)
+        journal.jsonl  - ekleme/silme/temizleme kayıtları (satır başına bir JSON)
+    """
+    def __init__(self, directory, compact_threshold=1000, feature_version=1):
+        self.directory = directory
+        self.compact_threshold = compact_threshold  # Bu kadar günlük kaydından sonra sıkıştır
+        self.feature_version = feature_version  # Farklı sürümde yazılmış vektörler karşılaştırılamaz
+
+        self.ids_path = os.path.join(directory, "ids.json")
+        self.journal_vectors_path = os.path.join(directory, "journal.f32")
+        self.journal_path = os.path.join(directory, "journal.jsonl")
+
+        self.metadata = {}
+        self.generation = 0  # Her sıkıştırmada yeni matris dosyası (açık eşlemenin üzerine yazılmaz)
+        self.journal_entries = 0
+        self._journal_rows = None  # journal.f32 içindeki geçerli vektör sayısı (load ile belirlenir)
+
+    def exists(self):
+        return os.path.exists(self.ids_path) or os.path.exists(self.journal_path)
+
+    def stored_version(self):
+        """Depodaki vektörlerin özellik sürümü (depo yoksa None)"""
+        if os.path.exists(self.ids_path):
+            with open(self.ids_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("feature_version", 1)
+        records, _ = self._read_journal()
+        for record in records:
+            if record.get("op") == "add":
+                return record.get("v", 1)
+        return None
+
+    def archive(self):
+        """Depoyu sürüm sonekli bir dizine taşır (eski sürüm vektörleri silinmez)"""
+        target = f"{self.directory}.v{self.stored_version()}"
+        suffix = 1
+        while os.path.exists(target):
+            suffix += 1
+            target = f"{self.directory}.v{self.stored_version()}-{suffix}"
+        os.replace(self.directory, target)
+        self.metadata = {}
+        self.generation = 0
+        self.journal_entries = 0
+        self._journal_rows = None
+        return target
+
+    def _read_base(self):
+        """Sıkıştırılmış matrisi kopyasız (yazılırsa kopyalanan) eşlemeyle açar"""
+        if not os.path.exists(self.ids_path):
+            return [], None, {}
+
+        with open(self.ids_path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("feature_version", 1) != self.feature_version:
+            raise ValueError(f"Yüz veritabanı özellik sürümü {header.get('feature_version', 1)}, "
+                             f"beklenen {self.feature_version}")
+
+        ids = header.get("ids", [])
+        metadata = header.get("metadata", {})
+        self.generation = header.get("generation", 0)
+
+        matrix = None
+        features_path = os.path.join(self.directory, header.get("features", ""))
+        if ids and os.path.isfile(features_path):
+            matrix = np.load(features_path, mmap_mode="c")
+        return ids, matrix, metadata
+
+    def _read_journal(self):
+        """Günlük kayıtlarını okur; yarım yazılmış son satır atlanır"""
+        records = []
+        if not os.path.exists(self.journal_path):
+            return records, None
+
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+
+        vectors = None
+        if os.path.exists(self.journal_vectors_path):
+            vectors = np.fromfile(self.journal_vectors_path, dtype=np.float32)
+        return records, vectors
+
+    def load(self):
+        """(kimlikler, (N, D) float32 matris, üst veri) döndürür
+
+        Günlük boşsa matris doğrudan bellek eşlemeli dosyadır; maliyet kadro boyutuyla büyümez.
+        """
+        ids, base, metadata = self._read_base()
+        records, journal_vectors = self._read_journal()
+        self.metadata = metadata
+        self.journal_entries = len(records)
+        self._journal_rows = 0
+
+        if not records:
+            return ids, base, metadata
+
+        # Kimlik -> (kaynak, satır): kaynak 0 = sıkıştırılmış matris, 1 = günlük
+        sources = {face_id: (0, row) for row, face_id in enumerate(ids)}
+        dim = base.shape[1] if base is not None else None
+        for record in records:
+            op = record.get("op")
+            if op == "add":
+                if record.get("v", 1) != self.feature_version:
+                    raise ValueError(f"Günlükte özellik sürümü {record.get('v', 1)}, beklenen {self.feature_version}")
+                dim = record["dim"]
+                row = record["row"]
+                if journal_vectors is None or (row + 1) * dim > len(journal_vectors):
+                    break  # Vektörü tamamlanmamış kayıt
+                sources[record["id"]] = (1, row)
+                if "meta" in record:
+                    metadata[record["id"]] = record["meta"]
+                self._journal_rows = row + 1
+            elif op == "remove":
+                sources.pop(record["id"], None)
+                metadata.pop(record["id"], None)
+            elif op == "clear":
+                sources.clear()
+                metadata.clear()
+
+        ids = list(sources.keys())
+        if not ids or dim is None:
+            return [], None, {}
+
+        # Canlı satırları tek seferde topla
+        matrix = np.empty((len(ids), dim), dtype=np.float32)
+        kinds = np.array([sources[face_id][0] for face_id in ids])
+        rows = np.array([sources[face_id][1] for face_id in ids])
+        if base is not None:
+            matrix[kinds == 0] = base[rows[kinds == 0]]
+        if np.any(kinds == 1):
+            matrix[kinds == 1] = journal_vectors[:self._journal_rows * dim].reshape(-1, dim)[rows[kinds == 1]]
+        return ids, matrix, metadata
+
+    def _append_record(self, record):
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.journal_entries += 1
+
+    def append(self, face_id, features, metadata=None):
+        """Yeni kaydı günlüğe ekler - maliyet yalnızca vektör boyutuna bağlı"""
+        os.makedirs(self.directory, exist_ok=True)
+        vector = np.asarray(features, dtype=np.float32).reshape(-1)
+        if self._journal_rows is None:
+            self.load()
+
+        # Önce vektör, sonra onu gösteren kayıt; kayıtsız kalmış yarım vektör varsa üzerine yazılır
+        mode = "r+b" if os.path.exists(self.journal_vectors_path) else "wb"
+        with open(self.journal_vectors_path, mode) as f:
+            f.seek(self._journal_rows * vector.nbytes)
+            f.truncate()
+            f.write(vector.tobytes())
+
+        record = {"op": "add", "id": face_id, "row": self._journal_rows, "dim": len(vector),
+                  "v": self.feature_version}
+        if metadata is not None:
+            record["meta"] = metadata
+            self.metadata[face_id] = metadata
+        self._append_record(record)
+        self._journal_rows += 1
+
+    def remove(self, face_id):
+        if not os.path.exists(self.directory):
+            return
+        self._append_record({"op": "remove", "id": face_id})
+        self.metadata.pop(face_id, None)
+
+    def needs_compaction(self):
+        return self.journal_entries >= self.compact_threshold
+
+    def compact(self, ids, matrix, metadata=None, feature_version=None):
+        """Canlı kayıtları yeni matris dosyasına yazar ve günlüğü sıfırlar (atomik değiştirme)"""
+        os.makedirs(self.directory, exist_ok=True)
+        if feature_version is None:
+            feature_version = self.feature_version
+        ids = list(ids)
+        if metadata is None:
+            metadata = self.metadata
+        metadata = {face_id: metadata[face_id] for face_id in ids if face_id in metadata}
+
+        if len(ids) == 0:
+            matrix = np.empty((0, 0), dtype=np.float32)
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+
+        # Yeni nesil matris dosyası; ids.json atomik olarak ona yönlendirilir
+        self.generation += 1
+        features_name = f"features-{self.generation}.npy"
+        np.save(os.path.join(self.directory, features_name), matrix)
+
+        temporary_ids = self.ids_path + ".tmp"
+        with open(temporary_ids, "w", encoding="utf-8") as f:
+            json.dump({"generation": self.generation, "feature_version": feature_version,
+                       "features": features_name, "ids": ids, "metadata": metadata}, f, ensure_ascii=False)
+        os.replace(temporary_ids, self.ids_path)
+
+        # Günlük ve eski nesiller en son silinir (hâlâ eşlenmiş olanlar sonraki sıkıştırmaya kalır)
+        for name in os.listdir(self.directory):
+            stale = name.startswith("features-") and name.endswith(".npy") and name != features_name
+            if stale or name in ("journal.jsonl", "journal.f32"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+        self.metadata = metadata
+        self.journal_entries = 0
+        self._journal_rows = 0
+
+    def clear(self):
+        self.compact([], None, {})
+
+    def migrate_pickle(self, pickle_path):
+        """Eski face_database.pkl dosyasını bir kez bu biçime taşır ve .migrated olarak yeniden adlandırır
+
+        Yalnızca uygulamanın kendi yerel dosyası için kullanılır; paylaşılan depodaki pickle yüklenmemelidir.
+        Pickle vektörleri ilk özellik sürümündedir (1).
+        """
+        if self.exists() or not os.path.exists(pickle_path):
+            return 0
+
+        with open(pickle_path, "rb") as f:
+            face_database = pickle.load(f)
+
+        ids = list(face_database.keys())
+        matrix = np.asarray([face_database[face_id] for face_id in ids], dtype=np.float32)
+        self.compact(ids, matrix, {}, feature_version=1)
+        os.replace(pickle_path, pickle_path + ".migrated")
+        return len(ids)
@@ -0,0 +1,98 @@
+import cv2
+import numpy as np
+import threading
+
+class FrameContext:
+    """Kare başına tembel renk dönüşümü (gray, hsv, rgb) ve türetilmiş değer önbelleği"""
+    # Ad -> (OpenCV dönüşüm kodu, kanal sayısı)
+    CONVERSIONS = {
+        "gray": (cv2.COLOR_BGR2GRAY, 1),
+        "hsv": (cv2.COLOR_BGR2HSV, 3),
+        "rgb": (cv2.COLOR_BGR2RGB, 3)
+    }
+
+    def __init__(self):
+        self.frame = None
+        self.frame_index = 0
+
+        # Tam kare tamponları ve bu karede geçerli olanlar
+        self._buffers = {}
+        self._valid = set()
+
+        # Bölge (ROI) dönüşümleri: (ad, bbox) -> dizi, yalnızca bu kare için
+        self._roi_cache = {}
+
+        # Kare başına türetilmiş değerler (ör. yüz hizalaması): ad -> değer
+        self._values = {}
+
+        # Filtre iş parçacığı ile ana iş parçacığı aynı önbelleği kullanır
+        self._lock = threading.Lock()
+
+    def reset(self, frame):
+        """Yeni kareye geçer; tamponlar korunur, içerikleri geçersiz sayılır"""
+        with self._lock:
+            self.frame = frame
+            self.frame_index += 1
+            self._valid.clear()
+            self._roi_cache.clear()
+            self._values.clear()
+
+    def _get_buffer(self, key, shape):
+        """Adlandırılmış tamponu döndürür, boyut değiştiyse yeniden ayırır"""
+        buffer = self._buffers.get(key)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self._buffers[key] = buffer
+        return buffer
+
+    @staticmethod
+    def _shape_for(image, channels):
+        return image.shape[:2] if channels == 1 else image.shape[:2] + (channels,)
+
+    def get(self, name, roi=None):
+        """İstenen gösterimi döndürür; roi=(x_min, y_min, x_max, y_max) yalnızca o bölgeyi dönüştürür"""
+        if name not in self.CONVERSIONS:
+            raise KeyError(f"Bilinmeyen dönüşüm: {name}")
+
+        code, channels = self.CONVERSIONS[name]
+
+        with self._lock:
+            # Tam kare zaten hesaplandıysa bölge bir görünümdür
+            if name in self._valid:
+                buffer = self._buffers[name]
+                if roi is None:
+                    return buffer
+                x_min, y_min, x_max, y_max = roi
+                return buffer[y_min:y_max, x_min:x_max]
+
+            if roi is None:
+                buffer = self._get_buffer(name, self._shape_for(self.frame, channels))
+                cv2.cvtColor(self.frame, code, dst=buffer)
+                self._valid.add(name)
+                return buffer
+
+            # Yalnızca bölgeyi dönüştür (kare başına bölge başına bir kez)
+            key = (name, tuple(roi))
+            region = self._roi_cache.get(key)
+            if region is None:
+                x_min, y_min, x_max, y_max = roi
+                region = cv2.cvtColor(self.frame[y_min:y_max, x_min:x_max], code)
+                self._roi_cache[key] = region
+            return region
+
+    def cached(self, key, compute):
+        """Bu kare için key değerini bir kez hesaplar; sonraki çağrılar önbellekten döner"""
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+
+        value = compute()
+        with self._lock:
+            return self._values.setdefault(key, value)
+
+    def to_rgb(self, image, name="display"):
+        """İşlenmiş bir görüntüyü yeniden kullanılan tampona RGB olarak dönüştürür (gösterim için)"""
+        with self._lock:
+            buffer = self._get_buffer(name, image.shape)
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=buffer)
+            return buffer
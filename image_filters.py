@@ -0,0 +1,158 @@
+import cv2
+import numpy as np
+
+class LUTStage:
+    """Piksel başına arama tablosu (LUT) uygulayan filtre aşaması"""
+    def __init__(self, table):
+        self.table = np.asarray(table, dtype=np.uint8).reshape(256, 1)
+
+    def process(self, src, dst, frame_ctx=None):
+        cv2.LUT(src, self.table, dst=dst)
+        return dst
+
+class ColorMatrixStage:
+    """3x3 renk matrisi (BGR -> BGR) uygulayan filtre aşaması"""
+    def __init__(self, matrix):
+        self.matrix = np.asarray(matrix, dtype=np.float32).reshape(3, 3)
+
+    def process(self, src, dst, frame_ctx=None):
+        cv2.transform(src, self.matrix, dst=dst)
+        return dst
+
+class BlurStage:
+    """Bulanıklaştırma aşaması - büyük çekirdeklerde kutu filtresi yaklaşımı kullanır"""
+    def __init__(self, ksize, box_threshold=7):
+        self.ksize = ksize | 1  # Tek sayı olmalı
+        # GaussianBlur ile aynı sigma (OpenCV formülü)
+        self.sigma = 0.3 * ((self.ksize - 1) * 0.5 - 1) + 0.8
+        self.box_threshold = box_threshold
+
+        # Üç kutu filtresi geçişi Gauss'a yaklaşır: sigma^2 = 3 * (w^2 - 1) / 12
+        box_width = int(round(np.sqrt(4 * self.sigma ** 2 + 1)))
+        self.box_size = (box_width, box_width)
+
+    def process(self, src, dst, frame_ctx=None):
+        if self.ksize <= self.box_threshold:
+            # Küçük çekirdek: ayrılabilir Gauss yeterince ucuz
+            cv2.GaussianBlur(src, (self.ksize, self.ksize), 0, dst=dst)
+        else:
+            # Büyük çekirdek: kutu filtresi maliyeti çekirdek boyutundan bağımsız
+            cv2.blur(src, self.box_size, dst=dst)
+            cv2.blur(dst, self.box_size, dst=dst)
+            cv2.blur(dst, self.box_size, dst=dst)
+        return dst
+
+class GrayStage:
+    """Siyah-beyaz aşaması - karenin gri gösterimi önbellekte varsa onu kullanır"""
+    def __init__(self):
+        self._gray = None
+
+    def process(self, src, dst, frame_ctx=None):
+        if frame_ctx is not None:
+            gray = frame_ctx.get("gray")
+        else:
+            if self._gray is None or self._gray.shape != src.shape[:2]:
+                self._gray = np.empty(src.shape[:2], dtype=np.uint8)
+            gray = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR, dst=dst)
+        return dst
+
+class EdgeStage:
+    """Canny kenar algılama aşaması"""
+    def __init__(self, low_threshold=50, high_threshold=150):
+        self.low_threshold = low_threshold
+        self.high_threshold = high_threshold
+
+        # Kareler arasında yeniden kullanılan ara tamponlar
+        self._gray = None
+        self._edges = None
+
+    def process(self, src, dst, frame_ctx=None):
+        if self._edges is None or self._edges.shape != src.shape[:2]:
+            self._gray = np.empty(src.shape[:2], dtype=np.uint8)
+            self._edges = np.empty(src.shape[:2], dtype=np.uint8)
+
+        if frame_ctx is not None:
+            gray = frame_ctx.get("gray")
+        else:
+            gray = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        cv2.Canny(gray, self.low_threshold, self.high_threshold, edges=self._edges)
+        cv2.cvtColor(self._edges, cv2.COLOR_GRAY2BGR, dst=dst)
+        return dst
+
+class ImageFilters:
+    def __init__(self):
+        # Filtre adı -> aşama listesi (zincir)
+        self.chains = {}
+
+        # Önceden ayrılmış çıkış tamponları (ping-pong)
+        self._buffers = [None, None]
+
+        # Varsayılan filtreleri kaydet
+        self._register_default_filters()
+
+    def _register_default_filters(self):
+        """Uygulamanın kullandığı filtreleri kaydeder"""
+        # Siyah-beyaz: paylaşılan gri gösterimden
+        self.register_filter("Siyah-Beyaz", GrayStage())
+
+        # Sepya renk matrisi
+        self.register_filter("Sepya", ColorMatrixStage([[0.272, 0.534, 0.131],
+                                                        [0.349, 0.686, 0.168],
+                                                        [0.393, 0.769, 0.189]]))
+
+        # Negatif: LUT ile
+        self.register_filter("Negatif", LUTStage(255 - np.arange(256)))
+
+        # Bulanık: 15x15 Gauss eşdeğeri
+        self.register_filter("Bulanık", BlurStage(15))
+
+        # Kenar algılama
+        self.register_filter("Kenar Algılama", EdgeStage())
+
+    def register_filter(self, name, *stages):
+        """Bir veya daha fazla aşamadan oluşan filtreyi kaydeder"""
+        if not stages:
+            return False
+        self.chains[name] = list(stages)
+        return True
+
+    def register_chain(self, name, filter_names):
+        """Kayıtlı filtreleri sırayla birleştiren yeni bir filtre zinciri kaydeder"""
+        stages = []
+        for filter_name in filter_names:
+            if filter_name not in self.chains:
+                return False
+            stages.extend(self.chains[filter_name])
+        return self.register_filter(name, *stages)
+
+    def get_available_filters(self):
+        """Kullanılabilir filtrelerin listesini döndürür"""
+        return ["Normal"] + list(self.chains.keys())
+
+    def _get_buffer(self, index, shape):
+        """Çıkış tamponunu döndürür, boyut değiştiyse yeniden ayırır"""
+        buffer = self._buffers[index]
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self._buffers[index] = buffer
+        return buffer
+
+    def apply(self, frame, filter_name, frame_ctx=None):
+        """Filtreyi uygular; sonuç bir sonraki çağrıda yeniden kullanılan tampondur"""
+        stages = self.chains.get(filter_name)
+        if not stages:  # Normal
+            return frame
+
+        # Dönüşüm önbelleği yalnızca ham kareyi okuyan ilk aşamada geçerlidir
+        if frame_ctx is not None and frame_ctx.frame is not frame:
+            frame_ctx = None
+
+        src = frame
+        for i, stage in enumerate(stages):
+            dst = self._get_buffer(i % 2, frame.shape)
+            src = stage.process(src, dst, frame_ctx if i == 0 else None)
+
+        return src
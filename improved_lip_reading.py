@@ -1,20 +1,25 @@
 import cv2
 import numpy as np
 import time
-from collections import deque
+from ring_buffer import RingBuffer
+from lip_features import LipFeatureExtractor
+from sequence_matching import DTWMatcher, IncrementalWindowMatcher
 
 class ImprovedLipReading:
-    def __init__(self):
+    def __init__(self, matching="dtw"):
         # Dudak indeksleri (48-67 arası noktalar dudakları temsil eder)
         self.lip_indices = list(range(48, 68))
         
         # Kelime tahmin etme için gerekli değişkenler
-        self.lip_history = deque(maxlen=30)  # Son 30 dudak şekli
+        self.lip_history = RingBuffer(90, dim=3)  # Son 90 dudak şekli (T, 3) - eşleştirme geçmişi yeniden taramaz
         self.word_buffer = ""
         self.last_prediction = ""
         self.confidence = 0.0
-        self.last_prediction_time = 0
-        self.prediction_cooldown = 1.0  # saniye
+        
+        # Tepe seçimi: örtüşen pencerelerden en iyisi, daha iyisi gelemeyeceği anda bir kez bildirilir
+        self._frame = 0
+        self._pending = None  # (kelime, skor, pencere uzunluğu, bitiş karesi)
+        self._last_end = 0  # Son bildirilen pencerenin bitiş karesi
         
         # Kelime kalıpları (gerçek uygulamada makine öğrenimi modeli kullanılır)
         self.word_patterns = {
@@ -24,6 +29,28 @@ class ImprovedLipReading:
             "hayır": [(0.2, 0.4, 0.6), (0.3, 0.3, 0.5), (0.4, 0.2, 0.4)],
             "teşekkürler": [(0.3, 0.4, 0.6), (0.4, 0.3, 0.5), (0.3, 0.2, 0.4), (0.2, 0.3, 0.5), (0.3, 0.4, 0.6)]
         }
+        self.similarity_threshold = 0.6
+        
+        # "dtw": hıza dayanıklı eşleştirme, "window": sabit hizalı kayan pencere
+        self.matching = matching
+        self.dtw_matcher = DTWMatcher()
+        self.window_matcher = IncrementalWindowMatcher()
+        self._window_scores = np.zeros(0)  # Son örnekte biten pencerelerin skorları
+        self._compile_patterns()
+        
+        # Sabit boyutlu hizalanmış dudak kırpması (öğrenilmiş modeller için de bu vektör kullanılır)
+        self.feature_extractor = LipFeatureExtractor()
+        self.last_appearance = None
+    
+    def _compile_patterns(self):
+        """Kalıpları eşleştiricilere yükler; kelime sırası korunur"""
+        self.dtw_matcher.set_patterns(self.word_patterns)
+        self.window_matcher.set_patterns(self.word_patterns)
+    
+    def add_word_pattern(self, word, pattern):
+        """Yeni kelime kalıbı ekler (veya günceller)"""
+        self.word_patterns[word] = [tuple(step) for step in pattern]
+        self._compile_patterns()
     
     def extract_lip_region(self, frame, landmarks):
         """Dudak bölgesini çıkarır"""
@@ -108,18 +135,33 @@ class ImprovedLipReading:
         
         return shape, confidence
     
-    def extract_lip_features(self, lip_region, lip_points):
-        """Dudak bölgesinden özellikler çıkarır"""
-        # Dudak bölgesi boyutları
-        if lip_region.size == 0:
-            return (0, 0, 0)
-        
-        # Renk özellikleri
-        hsv = cv2.cvtColor(lip_region, cv2.COLOR_BGR2HSV)
-        h, s, v = cv2.split(hsv)
-        h_mean = np.mean(h) / 180.0  # 0-1 arası normalize et
-        s_mean = np.mean(s) / 255.0
-        v_mean = np.mean(v) / 255.0
+    def extract_lip_features(self, lip_region, lip_points, lip_hsv=None, frame=None, alignment=None):
+        """Dudak bölgesinden özellikler çıkarır
+        
+        frame ve yüz hizalaması verilirse renk, sabit boyutlu hizalanmış kırpmada ağız maskesinden hesaplanır.
+        """
+        if frame is not None and alignment is not None:
+            self.last_appearance = self.feature_extractor.extract(frame, alignment=alignment)
+            h_mean, s_mean = float(self.last_appearance[0]), float(self.last_appearance[1])
+        else:
+            # Dudak bölgesi boyutları
+            if lip_region.size == 0:
+                return (0, 0, 0)
+            
+            # Renk özellikleri (HSV gösterimi verildiyse yeniden dönüştürme)
+            if lip_hsv is not None and lip_hsv.shape == lip_region.shape:
+                hsv = lip_hsv
+            else:
+                hsv = cv2.cvtColor(lip_region, cv2.COLOR_BGR2HSV)
+            
+            # Dış dudak çizgisi içi ortalama (tek geçiş)
+            mask = np.zeros(lip_region.shape[:2], dtype=np.uint8)
+            cv2.fillPoly(mask, [np.round(np.asarray(lip_points[:12])).astype(np.int32)], 255)
+            if not mask.any():
+                mask = None
+            h_mean, s_mean, _, _ = cv2.mean(hsv, mask=mask)
+            h_mean /= 180.0  # 0-1 arası normalize et
+            s_mean /= 255.0
         
         # Şekil özellikleri
         shape, _ = self.analyze_lip_shape(lip_points)
@@ -134,62 +176,70 @@ class ImprovedLipReading:
         # Özellik vektörü
         features = (h_mean, s_mean, shape_value)
         
-        # Geçmişe ekle
+        # Geçmişe ekle; sabit pencere eşleştiricisi yalnızca bu örnekte biten pencereleri günceller
         self.lip_history.append(features)
+        self._window_scores = self.window_matcher.push(features)
         
         return features
     
     def predict_word(self, features):
-        """Dudak özelliklerinden kelime tahmin eder"""
+        """Her karede bir kez çağrılır; bir kelime tamamlandığında (kelime, skor), aksi halde ("", 0.0)
+        
+        Yalnızca son örnekte biten pencereler değerlendirilir. Aynı konuşmanın ardışık karelerde
+        tekrar tekrar bildirilmemesi için skor tepe yaptığında bir kez bildirilir.
+        """
         if len(self.lip_history) < 3:
             return "", 0.0
         
-        best_word = ""
-        best_score = 0.0
+        word = ""
+        score = 0.0
+        length = 0
+        if self.matching == "dtw":
+            # Benzerlik = 1 - adım başına DTW mesafesi; eşiği aşamayacak adaylar budanır
+            matched, distance = self.dtw_matcher.match(self.lip_history.to_array(self.dtw_matcher.span),
+                                                       max_distance=1.0 - self.similarity_threshold)
+            if matched:
+                word, score, length = matched, 1.0 - distance, self.dtw_matcher.match_length
+        elif len(self._window_scores) > 0:
+            best = int(np.argmax(self._window_scores))  # Eşitlikte ilk kelime (sözlük sırası)
+            if self._window_scores[best] > self.similarity_threshold:  # Eşik değeri
+                word = self.window_matcher.words[best]
+                score = float(self._window_scores[best])
+                length = int(self.window_matcher.lengths[best])
         
-        # Her kelime kalıbı için benzerlik hesapla
-        for word, patterns in self.word_patterns.items():
-            similarity = self._calculate_similarity(list(self.lip_history), patterns)
-            
-            if similarity > best_score and similarity > 0.6:  # Eşik değeri
-                best_score = similarity
-                best_word = word
+        return self._pick_peak(word, score, length)
+    
+    def _pick_peak(self, word, score, length):
+        """Örtüşen pencerelerdeki eşleşmelerden en yükseğini bir kez bildirir"""
+        self._frame += 1
+        if word and self._frame - length < self._last_end:
+            word = ""  # Bildirilen kelimenin penceresiyle örtüşüyor: aynı konuşma
         
-        # Sonuçları güncelle
-        if best_word:
-            self.last_prediction = best_word
-            self.confidence = best_score
+        if word and (self._pending is None or score > self._pending[1]):
+            self._pending = (word, score, length, self._frame)
+            return "", 0.0
         
-        return best_word, best_score
-    
-    def _calculate_similarity(self, history, patterns):
-        """Dudak hareketi geçmişi ile kelime kalıpları arasındaki benzerliği hesaplar"""
-        if len(history) < len(patterns):
-            return 0.0
+        if self._pending is None:
+            return "", 0.0
         
-        max_score = 0.0
+        best_word, best_score, best_length, end = self._pending
+        if self._frame - end < best_length:
+            return "", 0.0  # Bu pencereyle örtüşen daha iyi bir eşleşme hâlâ gelebilir
         
-        # Geçmiş içinde kaydırarak en iyi eşleşmeyi bul
-        for i in range(len(history) - len(patterns) + 1):
-            segment = history[i:i+len(patterns)]
-            score = 0.0
-            
-            # Her özellik için benzerlik hesapla
-            for j in range(len(patterns)):
-                pattern = patterns[j]
-                actual = segment[j]
-                
-                # Özellikler arasındaki benzerliği hesapla
-                feature_similarity = 1.0 - min(1.0, sum(abs(a - b) for a, b in zip(pattern, actual)) / len(pattern))
-                score += feature_similarity
-            
-            # Ortalama benzerlik
-            score /= len(patterns)
-            
-            if score > max_score:
-                max_score = score
+        self._pending = None
+        self._last_end = end
         
-        return max_score
+        # Sonuçları güncelle
+        self.last_prediction = best_word
+        self.confidence = best_score
+        return best_word, best_score
+    
+    def reset(self):
+        """Geçmişi ve açık pencereleri temizler (yüz kaybolduğunda)"""
+        self.lip_history.clear()
+        self.window_matcher.reset()
+        self._window_scores = np.zeros(0)
+        self._pending = None
     
     def visualize_lip_reading(self, frame, landmarks):
         """Dudak okuma sonuçlarını görselleştirir"""
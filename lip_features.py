@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+from face_alignment import CANONICAL_TEMPLATE, align_landmarks
+
+class LipFeatureExtractor:
+    """Dudak bölgesini sabit boyutlu, hizalanmış bir tampona örnekler ve özellik çıkarır
+
+    Kırpma yüz hizalamasından (kare -> şablon) türetilir; ağız her karede tamponda aynı yerde
+    durduğundan ağız maskesi bir kez hesaplanır. Tamponlar kareler arasında yeniden kullanılır.
+    """
+    def __init__(self, size=(64, 32), padding=0.25, histogram_bins=0, dct_size=0):
+        self.width, self.height = size
+        self.histogram_bins = histogram_bins  # 0 = histogram yok
+        self.dct_size = dct_size  # 0 = DCT yok; aksi halde sol üst dct_size x dct_size katsayı
+
+        # Şablondaki ağız kutusu (kenar boşluklu) -> kırpma tamponu
+        mouth = CANONICAL_TEMPLATE[48:68]
+        low = mouth.min(axis=0)
+        high = mouth.max(axis=0)
+        extent = (high - low) * (1.0 + 2.0 * padding)
+        scale = min(self.width / extent[0], self.height / extent[1])
+        center = (low + high) / 2.0
+        self._template_to_crop = np.array([
+            [scale, 0.0, self.width / 2.0 - scale * center[0]],
+            [0.0, scale, self.height / 2.0 - scale * center[1]],
+            [0.0, 0.0, 1.0]
+        ])
+
+        # Dış dudak çizgisi (48-59) içi ağız maskesi
+        outer = CANONICAL_TEMPLATE[48:60] @ self._template_to_crop[:2, :2].T + self._template_to_crop[:2, 2]
+        self.mask = np.zeros((self.height, self.width), dtype=np.uint8)
+        cv2.fillPoly(self.mask, [np.round(outer).astype(np.int32)], 255)
+
+        # Yeniden kullanılan tamponlar
+        self.crop = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self._hsv = np.zeros_like(self.crop)
+        self._gray = np.zeros((self.height, self.width), dtype=np.uint8)
+        self._gray_float = np.zeros((self.height, self.width), dtype=np.float32)
+        self._dct = np.zeros((self.height, self.width), dtype=np.float32)
+
+    @property
+    def dim(self):
+        """Özellik vektörü uzunluğu"""
+        return 3 + self.histogram_bins + self.dct_size * self.dct_size
+
+    def crop_matrix(self, alignment):
+        """Kareden kırpma tamponuna 2x3 afin matris"""
+        frame_to_template = np.vstack([alignment.matrix, [0.0, 0.0, 1.0]])
+        return (self._template_to_crop @ frame_to_template)[:2].astype(np.float32)
+
+    def extract(self, frame, landmarks=None, alignment=None):
+        """(dim,) float32 özellik: maske içi ortalama H, S, V (0-1), isteğe bağlı histogram ve DCT"""
+        if alignment is None:
+            alignment = align_landmarks(landmarks)
+
+        cv2.warpAffine(frame, self.crop_matrix(alignment), (self.width, self.height), dst=self.crop,
+                       flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+        cv2.cvtColor(self.crop, cv2.COLOR_BGR2HSV, dst=self._hsv)
+        h_mean, s_mean, v_mean, _ = cv2.mean(self._hsv, mask=self.mask)
+        parts = [np.array([h_mean / 180.0, s_mean / 255.0, v_mean / 255.0], dtype=np.float32)]
+
+        if self.histogram_bins or self.dct_size:
+            cv2.cvtColor(self.crop, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self.histogram_bins:
+            histogram = cv2.calcHist([self._gray], [0], self.mask, [self.histogram_bins], [0, 256]).reshape(-1)
+            parts.append(histogram / max(float(histogram.sum()), 1.0))
+
+        if self.dct_size:
+            # Düşük frekanslı katsayılar ağız biçiminin kaba görünümünü taşır
+            np.multiply(self._gray, 1.0 / 255.0, out=self._gray_float, casting="unsafe")
+            cv2.dct(self._gray_float, dst=self._dct)
+            parts.append(self._dct[:self.dct_size, :self.dct_size].reshape(-1))
+
+        return np.concatenate(parts).astype(np.float32, copy=False)
@@ -10,6 +10,11 @@ class LipReading:
         self.word_buffer = ""
         self.confidence = 0.0
         
+        # Son update çağrısının dudak kutusu ve şekli (çizim için; bölge yoksa None)
+        self.last_bbox = None
+        self.last_shape = "unknown"
+        self.last_shape_confidence = 0.0
+        
         # Basit dudak şekli - kelime eşleştirmeleri (gerçek uygulamada daha karmaşık bir model kullanılır)
         self.lip_shapes = {
             "open": ["A", "E", "I", "O", "U"],
@@ -103,6 +108,7 @@ class LipReading:
     
     def update(self, frame, points):
         """Dudak okuma işlemini güncelle"""
+        self.last_bbox = None
         if points is None or len(points) < 68:
             return None, None, 0.0
         
@@ -118,6 +124,8 @@ class LipReading:
         
         # Dudak şeklini analiz et
         lip_shape, confidence = self.analyze_lip_shape(lip_points)
+        self.last_bbox = tuple(int(v) for v in lip_bbox)
+        self.last_shape, self.last_shape_confidence = lip_shape, confidence
         
         # Dudak şeklini geçmişe ekle
         self.lip_history.append(lip_shape)
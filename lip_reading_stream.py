@@ -0,0 +1,190 @@
+import queue
+import threading
+from face_alignment import align_landmarks
+from lip_reading import LipReading
+try:
+    from improved_lip_reading import ImprovedLipReading
+except ImportError:
+    ImprovedLipReading = None  # Temel dudak okumaya geri dön
+
+class LipReadingResult:
+    """Bir karenin dudak okuma sonucu - kelime yalnızca tamamlandığı karede dolu"""
+    def __init__(self, frame_index, bbox, shape, shape_confidence, word="", confidence=0.0):
+        self.frame_index = frame_index
+        self.bbox = bbox  # (x_min, y_min, x_max, y_max)
+        self.shape = shape
+        self.shape_confidence = shape_confidence
+        self.word = word
+        self.confidence = confidence
+
+class LipReadingBackend:
+    """Dudak okuma arka ucu - alt sınıflar process(kare, noktalar, kare_no, hizalama) tanımlar
+
+    process bir LipReadingResult ya da (dudak bulunamazsa) None döndürür.
+    """
+    name = "base"
+
+    def reset(self):
+        pass
+
+class FeatureLipBackend(LipReadingBackend):
+    """ImprovedLipReading: hizalanmış kırpma özellikleri + kalıp eşleştirme"""
+    name = "improved"
+
+    def __init__(self, reader=None):
+        self.reader = reader if reader is not None else ImprovedLipReading()
+
+    def process(self, frame, points, frame_index=0, alignment=None):
+        lip_result = self.reader.extract_lip_region(frame, points)
+        if lip_result is None:
+            return None
+        lip_region, lip_bbox, lip_points = lip_result
+
+        shape, shape_confidence = self.reader.analyze_lip_shape(lip_points)
+        if alignment is None:
+            alignment = align_landmarks(points)
+        features = self.reader.extract_lip_features(lip_region, lip_points, frame=frame, alignment=alignment)
+        word, confidence = self.reader.predict_word(features)
+        return LipReadingResult(frame_index, lip_bbox, shape, shape_confidence, word, confidence)
+
+    def reset(self):
+        self.reader.reset()
+
+class PhonemeLipBackend(LipReadingBackend):
+    """Temel LipReading: dudak şekli -> fonem tamponu -> en yakın kelime"""
+    name = "basic"
+
+    def __init__(self, reader=None):
+        self.reader = reader if reader is not None else LipReading()
+
+    def process(self, frame, points, frame_index=0, alignment=None):
+        # Bölge çıkarma ve şekil analizi update içinde bir kez yapılır
+        _, word, confidence = self.reader.update(frame, points)
+        if self.reader.last_bbox is None:
+            return None
+        return LipReadingResult(frame_index, self.reader.last_bbox, self.reader.last_shape,
+                                self.reader.last_shape_confidence, word or "", confidence if word else 0.0)
+
+    def reset(self):
+        self.reader.lip_history.clear()
+        self.reader.word_buffer = ""
+
+def create_lip_backend(name="improved"):
+    """Ada göre arka uç; gelişmiş okuyucu yoksa temel okuyucu"""
+    if name == "improved" and ImprovedLipReading is not None:
+        return FeatureLipBackend()
+    return PhonemeLipBackend()
+
+class LipReadingStream:
+    """Tek akış arayüzü - push(frame_ctx, noktalar) kareyi arka plan iş parçacığına verir
+
+    Kuyrukta yalnızca en yeni kare bekler (eskisi atılır); böylece işleme yavaşlasa da
+    görüntü döngüsü bloklanmaz. Tamamlanan sonuçlar on_result ile bildirilir (iş parçacığından).
+    """
+    def __init__(self, backend=None, on_result=None):
+        self.backend = backend if backend is not None else create_lip_backend()
+        self.on_result = on_result
+        self.dropped = 0  # İşlenmeden yerine yenisi konan kare sayısı
+
+        self._queue = queue.Queue(maxsize=1)
+        self._latest = None
+        self._fresh = False
+        self._result_lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        self._reset_requested = False  # İş parçacığı bir sonraki karede arka ucu sıfırlar
+        self._last_error = None
+
+    def set_backend(self, backend):
+        """Arka ucu değiştirir; bekleyen kare atılır"""
+        self._drain()
+        self.backend = backend
+
+    def start(self):
+        if self._running:
+            return False
+        self._running = True
+        self._thread = threading.Thread(target=self._worker_loop)
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._running = False
+        self._drain()
+        try:
+            self._queue.put_nowait(None)  # İş parçacığını uyandır
+        except queue.Full:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def reset(self):
+        """Yüz kaybolduğunda geçmişi temizler"""
+        self._drain()
+        self._reset_requested = True
+
+    def push(self, frame_ctx, points):
+        """Kareyi işlenmek üzere kuyruğa ekler; son push'tan beri tamamlanan sonuç varsa onu döndürür"""
+        if points is not None and frame_ctx.frame is not None:
+            # Kare başına tek hizalama: tanıma ile aynı önbellek anahtarı
+            alignment = frame_ctx.cached("face_alignment", lambda: align_landmarks(points))
+            # Kare sonraki çizimlerden etkilenmesin diye kopyalanır (landmark'lar her karede yeni nesne)
+            self._submit((frame_ctx.frame.copy(), points, frame_ctx.frame_index, alignment))
+
+        with self._result_lock:
+            if not self._fresh:
+                return None
+            self._fresh = False
+            return self._latest
+
+    @property
+    def latest(self):
+        """En son tamamlanan sonuç (yoksa None)"""
+        with self._result_lock:
+            return self._latest
+
+    def _submit(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Bekleyen eski kareyi yenisiyle değiştir
+            self._drain()
+            self.dropped += 1
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                pass
+
+    def _drain(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def _worker_loop(self):
+        while self._running:
+            item = self._queue.get()
+            if self._reset_requested:
+                self._reset_requested = False
+                self.backend.reset()
+            if item is None:
+                continue
+            frame, points, frame_index, alignment = item
+
+            try:
+                result = self.backend.process(frame, points, frame_index, alignment)
+                if result is None:
+                    continue
+                with self._result_lock:
+                    self._latest = result
+                    self._fresh = True
+                if self.on_result is not None:
+                    self.on_result(result)
+            except Exception as e:
+                # Aynı hata her karede yazdırılmaz
+                if str(e) != self._last_error:
+                    self._last_error = str(e)
+                    print(f"Dudak okuma hatası: {e}")
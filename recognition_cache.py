@@ -0,0 +1,119 @@
+import numpy as np
+
+class FaceTrack:
+    """Kareler arasında IoU ile eşleştirilen yüz izi ve son tanıma sonucu"""
+    def __init__(self, track_id, rect, points):
+        self.track_id = track_id
+        self.rect = rect
+        self.shape = FaceTrack.normalize(rect, points)
+
+        self.face_id = None
+        self.distance = float("inf")
+        self.confidence = 0.0
+        self.queried = False
+        self.frames_since_query = 0
+        self.last_seen = 0
+
+    @staticmethod
+    def normalize(rect, points):
+        """Landmark'ları yüz kutusuna göre ölçekler (konum ve boyuttan bağımsız şekil)"""
+        x, y, w, h = rect
+        return (np.asarray(points, dtype=np.float32) - (x, y)) / max(w, 1)
+
+def rect_iou(a, b):
+    """İki (x, y, w, h) dikdörtgeninin kesişim / birleşim oranı"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    inter_h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    intersection = inter_w * inter_h
+    union = aw * ah + bw * bh - intersection
+    return intersection / union if union > 0 else 0.0
+
+class RecognitionCache:
+    """İz başına tanıma önbelleği - sorgu yalnızca her N karede, büyük şekil değişiminde
+    veya güven eşiğin altına düştüğünde yenilenir"""
+    def __init__(self, refresh_interval=15, decay=0.97, min_confidence=0.5, iou_threshold=0.3,
+                 shape_change_threshold=0.1, max_missed=10):
+        self.refresh_interval = refresh_interval  # Kare
+        self.decay = decay  # Kare başına güven çarpanı
+        self.min_confidence = min_confidence
+        self.iou_threshold = iou_threshold
+        self.shape_change_threshold = shape_change_threshold  # Yüz genişliğine oranla en büyük nokta kayması
+        self.max_missed = max_missed  # Görülmeyen iz bu kadar kare sonra silinir
+
+        self.tracks = {}
+        self.frame_index = 0
+        self._next_track_id = 1
+
+        # Önbellek isabet istatistikleri
+        self.queries = 0
+        self.hits = 0
+
+    def next_frame(self):
+        """Yeni kareye geçer ve uzun süredir görülmeyen izleri siler"""
+        self.frame_index += 1
+        stale = [track_id for track_id, track in self.tracks.items()
+                 if self.frame_index - track.last_seen > self.max_missed]
+        for track_id in stale:
+            del self.tracks[track_id]
+
+    def invalidate(self):
+        """Veritabanı değiştiğinde tüm sonuçları geçersiz kılar (izler korunur)"""
+        for track in self.tracks.values():
+            track.queried = False
+
+    def clear(self):
+        self.tracks = {}
+
+    def _match(self, rect, points):
+        """En yüksek IoU'lu izi döndürür; yoksa yeni iz açar"""
+        best_track = None
+        best_iou = self.iou_threshold
+        for track in self.tracks.values():
+            if track.last_seen == self.frame_index:
+                continue  # Bu karede başka bir yüzle eşleşti
+            iou = rect_iou(rect, track.rect)
+            if iou >= best_iou:
+                best_track = track
+                best_iou = iou
+
+        if best_track is None:
+            best_track = FaceTrack(self._next_track_id, rect, points)
+            self.tracks[best_track.track_id] = best_track
+            self._next_track_id += 1
+        return best_track
+
+    def confidence_for(self, distance, threshold):
+        """Karar sınırına (eşik) olan uzaklık: 0 = sınırda, 1 = kesin eşleşme / kesin yabancı"""
+        if not np.isfinite(distance):
+            return 1.0
+        return float(min(1.0, abs(threshold - distance) / threshold))
+
+    def lookup(self, rect, points, query, threshold):
+        """(kimlik, güven, iz no) döndürür; query(points) -> (kimlik, mesafe) yalnızca gerekince çağrılır"""
+        track = self._match(rect, points)
+        shape = FaceTrack.normalize(rect, points)
+        shape_change = float(np.max(np.linalg.norm(shape - track.shape, axis=1)))
+
+        track.rect = rect
+        track.last_seen = self.frame_index
+
+        needs_query = (not track.queried
+                       or track.frames_since_query >= self.refresh_interval
+                       or track.confidence < self.min_confidence
+                       or shape_change > self.shape_change_threshold)
+
+        if needs_query:
+            track.face_id, track.distance = query(points)
+            track.confidence = self.confidence_for(track.distance, threshold)
+            track.shape = shape
+            track.queried = True
+            track.frames_since_query = 0
+            self.queries += 1
+        else:
+            track.confidence *= self.decay
+            track.frames_since_query += 1
+            self.hits += 1
+
+        return track.face_id, track.confidence, track.track_id
@@ -0,0 +1,137 @@
+import time
+import numpy as np
+
+class RingBuffer:
+    """Sabit kapasiteli, zaman damgalı NumPy halka tamponu (O(1) toplam/ortalama/varyans)"""
+    def __init__(self, capacity, dim=1):
+        self.capacity = int(capacity)
+        self.dim = int(dim)
+
+        # Örnekler ve zaman damgaları
+        self.values = np.zeros((self.capacity, self.dim), dtype=np.float64)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+
+        # Her örneğe kadarki kümülatif toplamlar (zaman penceresi sorguları için)
+        self._cumulative = np.zeros((self.capacity, self.dim), dtype=np.float64)
+        self._cumulative_sq = np.zeros((self.capacity, self.dim), dtype=np.float64)
+
+        self.clear()
+
+    def clear(self):
+        """Tamponu boşaltır"""
+        self._head = 0  # Bir sonraki yazma konumu
+        self._count = 0
+        self._sum = np.zeros(self.dim, dtype=np.float64)
+        self._sum_sq = np.zeros(self.dim, dtype=np.float64)
+        self._total = np.zeros(self.dim, dtype=np.float64)
+        self._total_sq = np.zeros(self.dim, dtype=np.float64)
+
+    def __len__(self):
+        return self._count
+
+    def _physical(self, logical_index):
+        """Mantıksal sıra (0 = en eski) -> dizi indeksi"""
+        return (self._head - self._count + logical_index) % self.capacity
+
+    def append(self, value, timestamp=None):
+        """Yeni örnek ekler; tampon doluysa en eskisi düşer"""
+        value = np.asarray(value, dtype=np.float64).reshape(self.dim)
+        if timestamp is None:
+            timestamp = time.time()
+
+        # Dolu tamponda en eski örneği çalışan toplamlardan çıkar
+        if self._count == self.capacity:
+            oldest = self.values[self._head]
+            self._sum -= oldest
+            self._sum_sq -= oldest * oldest
+        else:
+            self._count += 1
+
+        self.values[self._head] = value
+        self.timestamps[self._head] = timestamp
+        self._sum += value
+        self._sum_sq += value * value
+
+        self._total += value
+        self._total_sq += value * value
+        self._cumulative[self._head] = self._total
+        self._cumulative_sq[self._head] = self._total_sq
+
+        self._head = (self._head + 1) % self.capacity
+
+    def last(self):
+        """En son örnek (boşsa None)"""
+        if self._count == 0:
+            return None
+        return self.values[(self._head - 1) % self.capacity]
+
+    def to_array(self, count=None):
+        """Örnekleri eskiden yeniye (N, dim) dizisi olarak döndürür (count verilirse son count örnek)"""
+        start = 0 if count is None else max(0, self._count - count)
+        indices = self._physical(np.arange(start, self._count))
+        return self.values[indices]
+
+    @staticmethod
+    def _stats(count, total, total_sq):
+        """(adet, ortalama, varyans) - boş pencerede ortalama/varyans 0"""
+        if count == 0:
+            zeros = np.zeros_like(total)
+            return 0, zeros, zeros
+        mean = total / count
+        variance = np.maximum(total_sq / count - mean * mean, 0.0)
+        return count, mean, variance
+
+    def sum(self):
+        return self._sum.copy()
+
+    def mean(self):
+        return self._stats(self._count, self._sum, self._sum_sq)[1]
+
+    def variance(self):
+        return self._stats(self._count, self._sum, self._sum_sq)[2]
+
+    def _first_index_after(self, cutoff):
+        """Zaman damgası cutoff'tan büyük ilk mantıksal indeks (ikili arama)"""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamps[self._physical(middle)] > cutoff:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def window_stats(self, seconds, now=None):
+        """Son `seconds` saniyedeki örnekler için (adet, ortalama, varyans) - O(log n)"""
+        if self._count == 0:
+            return self._stats(0, self._sum, self._sum_sq)
+        if now is None:
+            now = time.time()
+
+        first = self._first_index_after(now - seconds)
+        count = self._count - first
+        if count == 0:
+            return self._stats(0, self._sum, self._sum_sq)
+
+        if first == 0:
+            # Pencere tüm tamponu kapsıyor: kümülatif toplamlar atılmış örnekleri de içerir
+            return self._stats(count, self._sum, self._sum_sq)
+
+        # Pencere toplamı = son kümülatif - pencereden önceki kümülatif
+        newest = self._physical(self._count - 1)
+        before = self._physical(first - 1)
+        total = self._cumulative[newest] - self._cumulative[before]
+        total_sq = self._cumulative_sq[newest] - self._cumulative_sq[before]
+
+        return self._stats(count, total, total_sq)
+
+    def window_mean(self, seconds, now=None):
+        return self.window_stats(seconds, now)[1]
+
+    def window_values(self, seconds, now=None):
+        """Son `seconds` saniyedeki örnekler (eskiden yeniye)"""
+        if now is None:
+            now = time.time()
+        first = self._first_index_after(now - seconds)
+        indices = self._physical(np.arange(first, self._count))
+        return self.values[indices]
@@ -43,6 +43,12 @@ def main():
         if hasattr(app, 'voice_command_active') and app.voice_command_active:
             app.voice_commands.stop_listening()
             print("Sesli komut dinleme durduruldu.")
+        # Bekleyen olayları yaz ve olay hedeflerini kapat
+        if hasattr(app, 'event_bus'):
+            app.event_bus.stop()
+        # Dudak okuma iş parçacığını durdur
+        if hasattr(app, 'lip_reading_stream'):
+            app.lip_reading_stream.stop()
         print("Uygulama güvenli bir şekilde kapatıldı.")
     
     # Ctrl+C (KeyboardInterrupt) yakalamak için
@@ -0,0 +1,204 @@
+import numpy as np
+
+def resample_sequence(sequence, length):
+    """(L, D) diziyi doğrusal aradeğerleme ile (length, D) boyutuna getirir"""
+    sequence = np.asarray(sequence, dtype=np.float64)
+    if len(sequence) == length:
+        return sequence.copy()
+    source = np.linspace(0.0, 1.0, len(sequence))
+    target = np.linspace(0.0, 1.0, length)
+    return np.stack([np.interp(target, source, sequence[:, d]) for d in range(sequence.shape[1])], axis=1)
+
+def keogh_envelope(sequence, band):
+    """Sakoe-Chiba bandı içindeki alt/üst zarf: (..., L, D) -> (alt, üst)"""
+    sequence = np.asarray(sequence, dtype=np.float64)
+    length = sequence.shape[-2]
+    lower = sequence.copy()
+    upper = sequence.copy()
+    for shift in range(1, min(band, length - 1) + 1):
+        # i. adımın zarfı [i - shift, i + shift] aralığındaki en küçük/en büyük değer
+        lower[..., shift:, :] = np.minimum(lower[..., shift:, :], sequence[..., :-shift, :])
+        lower[..., :-shift, :] = np.minimum(lower[..., :-shift, :], sequence[..., shift:, :])
+        upper[..., shift:, :] = np.maximum(upper[..., shift:, :], sequence[..., :-shift, :])
+        upper[..., :-shift, :] = np.maximum(upper[..., :-shift, :], sequence[..., shift:, :])
+    return lower, upper
+
+def lb_keogh(query, lower, upper):
+    """LB_Keogh alt sınırı: (L, D) sorgu ile (P, L, D) zarflar -> (P,) toplam adım maliyeti
+
+    Adım maliyeti boyutlar üzerinde ortalama mutlak farktır; DTW mesafesinden büyük olamaz.
+    """
+    query = np.asarray(query, dtype=np.float64)
+    above = np.maximum(query - upper, 0.0)
+    below = np.maximum(lower - query, 0.0)
+    return (above + below).mean(axis=-1).sum(axis=-1)
+
+def dtw_distance(query, pattern, band, limit=np.inf):
+    """Sakoe-Chiba bantlı DTW (eşit uzunluklu diziler, adım maliyeti ortalama mutlak fark)
+
+    Bir satırın en küçük birikmiş maliyeti limit'i aşarsa erken bırakılır ve inf döner.
+    """
+    query = np.asarray(query, dtype=np.float64)
+    pattern = np.asarray(pattern, dtype=np.float64)
+    length = len(query)
+
+    # Tüm hücre maliyetleri tek seferde; bant dışı hücreler kullanılmaz
+    cost = np.abs(query[:, np.newaxis] - pattern[np.newaxis]).mean(axis=-1)
+
+    previous = np.full(length + 1, np.inf)
+    previous[0] = 0.0
+    current = np.full(length + 1, np.inf)
+    for i in range(1, length + 1):
+        current.fill(np.inf)
+        start = max(1, i - band)
+        end = min(length, i + band)
+        for j in range(start, end + 1):
+            current[j] = cost[i - 1, j - 1] + min(previous[j - 1], previous[j], current[j - 1])
+        if current[start:end + 1].min() > limit:
+            return np.inf
+        previous, current = current, previous
+    return float(previous[length])
+
+class DTWMatcher:
+    """Kelime kalıplarını DTW ile eşleştirir - LB_Keogh ile aday budama
+
+    Her kalıp farklı konuşma hızları için birkaç uzunluğa yeniden örneklenir; geçmişin son
+    Q örneği, Q uzunluğundaki adaylarla bantlı DTW ile karşılaştırılır.
+    """
+    def __init__(self, patterns=None, band_ratio=0.2, stretches=(0.75, 1.0, 1.5, 2.0), precompute_envelopes=True):
+        self.band_ratio = band_ratio  # Bant genişliği / dizi uzunluğu
+        self.stretches = stretches  # Kalıp uzunluğu çarpanları (yavaş/hızlı konuşma)
+        self.precompute_envelopes = precompute_envelopes
+
+        self.words = []
+        self._groups = {}  # Q -> (kelime indeksleri, (P, Q, D) adaylar, alt zarf, üst zarf)
+
+        # Son eşleştirmenin uzunluğu (örnek) ve budama istatistikleri
+        self.match_length = 0
+        self.candidates = 0
+        self.pruned = 0
+
+        if patterns:
+            self.set_patterns(patterns)
+
+    @property
+    def span(self):
+        """Eşleştirmede bakılan en uzun pencere (örnek)"""
+        return max(self._groups.keys(), default=0)
+
+    def band_for(self, length):
+        return max(1, int(round(length * self.band_ratio)))
+
+    def set_patterns(self, patterns):
+        """{kelime: (L, D) dizi} kalıplarından aday grupları (ve isteğe bağlı zarfları) hazırlar"""
+        self.words = list(patterns.keys())
+        grouped = {}
+        for index, word in enumerate(self.words):
+            pattern = np.asarray(patterns[word], dtype=np.float64)
+            lengths = {max(2, int(round(len(pattern) * stretch))) for stretch in self.stretches}
+            for length in lengths:
+                grouped.setdefault(length, ([], []))
+                grouped[length][0].append(index)
+                grouped[length][1].append(resample_sequence(pattern, length))
+
+        self._groups = {}
+        for length, (indices, candidates) in sorted(grouped.items()):
+            candidates = np.stack(candidates)
+            lower = upper = None
+            if self.precompute_envelopes:
+                lower, upper = keogh_envelope(candidates, self.band_for(length))
+            self._groups[length] = (np.array(indices), candidates, lower, upper)
+
+    def match(self, history, max_distance=np.inf):
+        """(kelime, adım başına DTW mesafesi) döndürür; max_distance altında eşleşme yoksa ("", inf)
+
+        Adaylar alt sınıra göre sıralanır; alt sınırı en iyi mesafeyi aşan aday hesaplanmaz.
+        """
+        history = np.asarray(history, dtype=np.float64)
+        self.match_length = 0
+        self.candidates = 0
+        self.pruned = 0
+
+        # Tüm uzunluklar için alt sınırlar (adım başına normalize, uzunluklar karşılaştırılabilir)
+        bounds = []
+        for length, (indices, candidates, lower, upper) in self._groups.items():
+            if length > len(history):
+                continue
+            if lower is None:
+                lower, upper = keogh_envelope(candidates, self.band_for(length))
+            query = history[-length:]
+            lb = lb_keogh(query, lower, upper) / length
+            self.candidates += len(indices)
+            for k in np.flatnonzero(lb < max_distance):
+                bounds.append((lb[k], length, k))
+        self.pruned = self.candidates - len(bounds)
+
+        best_word = ""
+        best_distance = max_distance
+        bounds.sort(key=lambda item: item[0])
+        for position, (bound, length, k) in enumerate(bounds):
+            if bound >= best_distance:
+                self.pruned += len(bounds) - position  # Kalanların alt sınırı da büyük
+                break
+            indices, candidates = self._groups[length][:2]
+            limit = best_distance * length
+            distance = dtw_distance(history[-length:], candidates[k], self.band_for(length), limit) / length
+            if distance < best_distance:
+                best_distance = distance
+                best_word = self.words[indices[k]]
+                self.match_length = length
+
+        if not best_word:
+            return "", np.inf
+        return best_word, float(best_distance)
+
+class IncrementalWindowMatcher:
+    """Sabit hizalı kayan pencere benzerliği - her yeni örnekte yalnızca o örnekte biten pencereler
+
+    Her kalıp için başlangıcı farklı olan açık pencerelerin kısmi benzerlik toplamları tutulur;
+    bir örnek eklemek O(kelime sayısı x kalıp uzunluğu) işlemdir, geçmiş yeniden taranmaz.
+    """
+    def __init__(self, patterns=None):
+        self.words = []
+        self.lengths = np.zeros(0, dtype=int)
+        self._patterns = np.zeros((0, 0, 0))
+        self._partial = np.zeros((0, 1))
+        self.samples = 0
+
+        if patterns:
+            self.set_patterns(patterns)
+
+    def set_patterns(self, patterns):
+        """Kalıpları (P, Lmax, D) diziye doldurur ve açık pencereleri sıfırlar"""
+        self.words = list(patterns.keys())
+        arrays = [np.asarray(patterns[word], dtype=np.float64) for word in self.words]
+        self.lengths = np.array([len(array) for array in arrays], dtype=int)
+
+        max_length = int(self.lengths.max()) if arrays else 0
+        dim = arrays[0].shape[1] if arrays else 0
+        self._patterns = np.zeros((len(arrays), max_length, dim))
+        for p, array in enumerate(arrays):
+            self._patterns[p, :len(array)] = array
+        self.reset()
+
+    def reset(self):
+        # _partial[p, k]: k örnek tüketmiş pencerenin, kalıbın ilk k adımına benzerlik toplamı
+        self._partial = np.zeros((len(self.words), self._patterns.shape[1] + 1))
+        self.samples = 0
+
+    def push(self, sample):
+        """Örneği ekler; (P,) dizi: her kalıbın bu örnekte biten penceresinin benzerliği (yoksa 0)"""
+        if len(self.words) == 0:
+            return np.zeros(0)
+        sample = np.asarray(sample, dtype=np.float64)
+        self.samples += 1
+
+        # Her açık pencere kalıbın bir sonraki adımıyla karşılaştırılır
+        step_similarity = 1.0 - np.minimum(1.0, np.abs(self._patterns - sample).mean(axis=-1))
+        self._partial[:, 1:] = self._partial[:, :-1] + step_similarity
+        self._partial[:, 0] = 0.0
+
+        rows = np.arange(len(self.words))
+        scores = self._partial[rows, self.lengths] / self.lengths
+        scores[self.lengths > self.samples] = 0.0  # Henüz tamamlanmamış
+        return scores